@@ -1,5 +1,6 @@
 import socket
 import sys
+import os
 sys.path.append('c:\\Users\\benja\\Desktop\\Stage_ANR_Match\\ScriptTest\\HSDmk3Haptic')
 from patternManager import PatternManager
 from signalSynth import SignalSynth
@@ -7,9 +8,12 @@ from playSignal import PlaySignal
 from presetTouch import PresetsTouch
 import time  # Importer le module pour gérer le temps
 
+# Dossier du cache des rendus, conservé entre deux lancements du serveur
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "cache")
+
 def start_server():
     pattern_manager = PatternManager()
-    signal_synth = SignalSynth()
+    signal_synth = SignalSynth(cacheDir=CACHE_DIR)
     presets = PresetsTouch()
 
     activePorts = [0, 1, 4, 5, 6, 7]
@@ -130,7 +134,8 @@ def start_server():
             pattern_manager.configurePatternFromPreset(preset)
 
             play_signal = PlaySignal(signal_synth, pattern_manager, activePorts, mappingIntensity)
-            play_signal.playSignal()
+            # Gains du pattern calculés pendant la lecture (pas de log précalculé)
+            play_signal.playStream()
 
 
     except Exception as e:
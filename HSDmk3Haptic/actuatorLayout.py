@@ -0,0 +1,125 @@
+import time
+
+import numpy as np
+from scipy.spatial import Delaunay, QhullError
+
+# Disposition d'origine : 6 actionneurs en grille 2×3 (I1 à I6) et ports de sortie associés
+# (mêmes correspondances que mappingIntensity/activePorts dans TCP)
+HSD_POSITIONS = ((0.1, 0.1), (0.9, 0.1), (0.1, 0.9), (0.9, 0.9), (0.5, 0.1), (0.5, 0.9))
+HSD_CHANNELS = (1, 7, 0, 6, 5, 4)
+HSD_NUM_CHANNELS = 20  # Sorties disponibles sur le HSDmk3
+
+
+class ActuatorLayout:
+    """Disposition d'actionneurs : identifiants, positions 2-D normalisées et canaux de sortie
+
+    La triangulation de Delaunay et sa structure de localisation sont calculées une seule fois.
+    Les intensités de l'actionneur fantôme sont les coordonnées barycentriques de la position
+    dans son triangle : au plus 3 actionneurs actifs, quel que soit leur nombre. Une position
+    hors de l'enveloppe convexe prend les intensités du point le plus proche du bord.
+    Objet immuable et hashable : utilisable comme clé des caches (compile_pattern, tables).
+    """
+
+    def __init__(self, ids, positions, channels):
+        self.ids = tuple(ids)
+        self.positions = tuple(tuple(float(c) for c in point) for point in positions)
+        self.channels = tuple(int(channel) for channel in channels)
+        if not len(self.ids) == len(self.positions) == len(self.channels):
+            raise ValueError("ids, positions et channels doivent avoir la même longueur")
+        if len(set(self.channels)) != len(self.channels):
+            raise ValueError(f"Canal attribué à plusieurs actionneurs : {self.channels}")
+
+        points = np.array(self.positions, dtype=np.float64)
+        if points.shape[0] < 3 or points.shape[1:] != (2,):
+            raise ValueError(f"Une disposition demande au moins 3 positions (x, y), reçu {len(self.positions)}")
+        try:
+            self.triangulation = Delaunay(points)
+        except QhullError:
+            raise ValueError(f"Positions alignées ou confondues, triangulation impossible : {self.positions}")
+        self.simplices = self.triangulation.simplices
+        # Transformée affine de chaque triangle vers ses coordonnées barycentriques
+        self.transform = self.triangulation.transform
+        # Arêtes du bord, pour les positions extérieures
+        self._hull = self.triangulation.convex_hull
+        self._edgeStart = points[self._hull[:, 0]]
+        self._edgeVector = points[self._hull[:, 1]] - self._edgeStart
+        self._key = (self.ids, self.positions, self.channels)
+
+    @classmethod
+    def grid(cls, rows, cols, channels=None, margin=0.1):
+        """Grille régulière rows × cols sur [margin, 1 - margin]², numérotée ligne par ligne"""
+        xs = np.linspace(margin, 1 - margin, cols)
+        ys = np.linspace(margin, 1 - margin, rows)
+        positions = [(x, y) for y in ys for x in xs]
+        if channels is None:
+            channels = range(len(positions))
+        return cls(range(1, len(positions) + 1), positions, channels)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __eq__(self, other):
+        return isinstance(other, ActuatorLayout) and self._key == other._key
+
+    def __hash__(self):
+        return hash(self._key)
+
+    def __repr__(self):
+        return f"ActuatorLayout({len(self)} actionneurs, canaux {self.channels})"
+
+    def _edgeWeights(self, points):
+        """Point du bord le plus proche de chaque point extérieur : (arête, position t sur l'arête)"""
+        offset = points[:, None, :] - self._edgeStart[None]
+        lengths = np.einsum('ej,ej->e', self._edgeVector, self._edgeVector)
+        t = np.clip(np.einsum('mej,ej->me', offset, self._edgeVector) / lengths, 0.0, 1.0)
+        gap = offset - t[..., None] * self._edgeVector[None]
+        edge = np.argmin(np.einsum('mej,mej->me', gap, gap), axis=1)
+        return edge, t[np.arange(len(points)), edge]
+
+    def gains(self, positions):
+        """Intensités (n actionneurs, m) pour m positions (m, 2), en un seul appel"""
+        points = np.asarray(positions, dtype=np.float64).reshape(-1, 2)
+        intensities = np.zeros((len(self), len(points)))
+        simplex = self.triangulation.find_simplex(points)
+        inside = np.flatnonzero(simplex >= 0)
+        outside = np.flatnonzero(simplex < 0)
+
+        transform = self.transform[simplex[inside]]
+        partial = np.einsum('mij,mj->mi', transform[:, :2], points[inside] - transform[:, 2])
+        weights = np.column_stack((partial, 1.0 - partial.sum(axis=1)))
+        np.clip(weights, 0.0, 1.0, out=weights)
+        intensities[self.simplices[simplex[inside]].T, inside] = weights.T
+
+        if len(outside):
+            # Hors enveloppe : interpolation linéaire entre les deux extrémités de l'arête la plus proche
+            edge, t = self._edgeWeights(points[outside])
+            intensities[self._hull[edge, 0], outside] = 1.0 - t
+            intensities[self._hull[edge, 1], outside] = t
+        return intensities
+
+    def gainsAt(self, x, y):
+        """Intensités des n actionneurs en (x, y) : liste de n valeurs"""
+        return self.gains(((x, y),))[:, 0].tolist()
+
+
+HSD_LAYOUT = ActuatorLayout(range(1, 7), HSD_POSITIONS, HSD_CHANNELS)
+
+
+if __name__ == "__main__":
+    # Coût par position selon le nombre d'actionneurs (localisation + poids barycentriques)
+    rng = np.random.default_rng(0)
+    positions = rng.uniform(0.0, 1.0, (100000, 2))
+    layouts = {
+        "HSDmk3 6 actionneurs": HSD_LAYOUT,
+        "Grille 4×5": ActuatorLayout.grid(4, 5, range(HSD_NUM_CHANNELS)),
+        "Grille 16×16": ActuatorLayout.grid(16, 16),
+    }
+    for name, layout in layouts.items():
+        layout.gains(positions[:10])
+        start = time.perf_counter()
+        intensities = layout.gains(positions)
+        batchTime = (time.perf_counter() - start) / len(positions)
+        active = np.count_nonzero(intensities, axis=0).max()
+        sums = intensities.sum(axis=0)
+        print(f"{name:<22} {batchTime * 1e6:.3f} µs par position, au plus {active} actionneurs actifs, "
+              f"somme des intensités [{sums.min():.6f}, {sums.max():.6f}]")
@@ -4,16 +4,27 @@ import tkinter as tk
 from tkinter import ttk, messagebox
 import matplotlib.pyplot as plt
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-from scipy.signal import butter, lfilter
 import time
-import threading
-import math
 import sys
+from pulseTrain import pulseTrain
+from svfFilter import StateVariableFilter
+from oscillatorBank import Oscillator, OSCILLATOR_TYPES
+from noiseBank import NoiseBank
+from filterDesign import filterSignal
+from envelopes import applyEnvelope, ENVELOPE_TYPES
+from intensityGrid import IntensityGrid
+from patternClock import PatternFrameGenerator, trajectoryPositions
+from trajectoryFile import Trajectory
+from trajectory import ACTUATORS
+from signalGraph import compilePreset
+from dspKernels import OnePoleSmoother, onePole
+from presetTouch import ParamTouch
 
 # ============= CONSTANTES ET CONFIGURATION =============
 SAMPLE_RATE = 48000  
 DURATION = 2.0       # Durée du signal       
 NUM_CHANNELS = 20    # Nombre de canaux du HSDmk3
+DTYPE = np.float32   # Précision du rendu, identique à celle du stream (pas de conversion)
 
 # Ports actifs et leurs noms
 ACTIVE_PORTS = [0, 1, 4, 5, 6, 7]  # Ports 1, 2, 5, 6, 7, 8 
@@ -33,6 +44,32 @@ INTENSITY_TO_PORT_MAPPING = {
     "I6": 2,  # I6 -> port5
 }
 
+# Disposition des actionneurs pilotés : None pour les 6 actionneurs du HSDmk3 (mapping ci-dessus),
+# ou une ActuatorLayout dont chaque actionneur i est envoyé sur le canal layout.channels[i]
+ACTUATOR_LAYOUT = None
+
+def intensity_ports(layout):
+    """Port de sortie de chaque intensité I1..In"""
+    if layout is not None:
+        return list(layout.channels)
+    return [ACTIVE_PORTS[INTENSITY_TO_PORT_MAPPING[f"I{i + 1}"]] for i in range(len(INTENSITY_TO_PORT_MAPPING))]
+
+INTENSITY_PORTS = intensity_ports(ACTUATOR_LAYOUT)
+# Ports alimentés par le callback : ceux de l'interface et ceux de la disposition
+DRIVEN_PORTS = sorted(set(ACTIVE_PORTS) | set(INTENSITY_PORTS))
+# Le stream n'ouvre que les sorties jusqu'au dernier port piloté (8 au lieu de 20)
+OUTPUT_CHANNELS = max(DRIVEN_PORTS) + 1
+
+# Signaux compilés en graphe et générés bloc par bloc par le callback (gain du bruit du "Mixte" : 2)
+GRAPH_SIGNALS = ("Sinusoïdal", "Bruit Blanc", "Tap", "Mixte")
+MIXTE_NOISE_GAIN = 2
+GAIN_SMOOTHING = 0.01  # Constante de temps du lissage des gains des ports (s)
+
+# Patterns de mouvement de l'interface
+GUI_PATTERNS = ["Circulaire", "Zigzag", "DroiteGauche", "Diagonal", "Horizontal", "Vertical"]
+MIN_PATTERN_STEP = 0.001   # Durée minimale d'un pas de pattern (s)
+PATTERN_DISPLAY_MS = 30    # Rafraîchissement du curseur pendant un pattern
+
 # Preset pour les paramètres de vibration
 presets = {
     "Carresse": {
@@ -74,16 +111,23 @@ waveform = None        # Signal généré
 stream = None          # Stream audio
 is_playing = False     # Indique si le signal est en cours de lecture
 buffer_position = 0    # Position actuelle dans le buffer audio
-pattern_thread = None  # Thread pour les patterns de mouvement
-pattern_running = False  # Indique si un pattern est en cours
+live_pattern = None    # Générateur des gains du pattern, avancé par le callback audio
 current_pattern = None   # Pattern actuel
+live_filter = None     # Filtre optionnel (ex. StateVariableFilter) appliqué bloc par bloc pendant la lecture
+live_oscillator = None # Oscillateur de la synthèse continue (remplace la lecture en boucle du buffer)
+live_graph = None      # Graphe du signal rejoué en boucle par le callback (signaux de GRAPH_SIGNALS)
+noise_bank = NoiseBank(SAMPLE_RATE, dtype=DTYPE)  # Tables de bruit filtré précalculées
+intensity_grid = IntensityGrid(ACTUATOR_LAYOUT if ACTUATOR_LAYOUT is not None else ACTUATORS)  # Intensités de l'actionneur fantôme sur le plan normalisé
 
 # Intensités individuelles pour chaque actionneur (valeurs initiales à 1.0)
-port_intensities = {port: 1.0 for port in ACTIVE_PORTS}
+port_intensities = {port: 1.0 for port in DRIVEN_PORTS}
+# Gains appliqués par le callback : ils suivent port_intensities sans saut d'un bloc à l'autre
+gain_smoothers = {port: OnePoleSmoother(SAMPLE_RATE, GAIN_SMOOTHING, 1.0) for port in DRIVEN_PORTS}
+onePole(np.zeros(1), 0.5, 0.0)  # Compilation Numba (ou chargement du cache) hors du callback audio
 
 # Liste pour stocker l'état de sélection des canaux
 selected_channels = [False] * NUM_CHANNELS  # Par défaut, tous les canaux sont désactivés
-for port in ACTIVE_PORTS:
+for port in DRIVEN_PORTS:
     selected_channels[port] = True  # Activation des ports spécifiés
 
 # ============= FONCTIONS AUDIO =============
@@ -102,7 +146,6 @@ def detect_audio_device():
 
 def apply_preset(preset_name):
     """Applique les paramètres du preset sélectionné"""
-    global pattern_running
     if preset_name not in presets:
         messagebox.showerror("Erreur", f"Preset '{preset_name}' non reconnu")
         return
@@ -122,7 +165,7 @@ def apply_preset(preset_name):
     sleep_label.config(text=f"Délai: {preset['delay']:.2f} s")
     
     # Mettre à jour le pattern actuel
-    if pattern_running: stop_pattern()
+    if live_pattern is not None: stop_pattern()
 
     generate_signal()
     if preset["pattern"]:
@@ -132,11 +175,11 @@ def apply_preset(preset_name):
         reset_cursor_and_intensities()
 
 from tkinter import filedialog  # Importer filedialog pour la sélection de fichiers
-import wave  # Pour lire les fichiers audio WAV
+from wavStream import resampledWav  # Pour lire les fichiers audio WAV
 
 def generate_signal(*args):
     """Génère le signal vibratoire selon les paramètres choisis"""
-    global waveform
+    global waveform, live_oscillator, live_graph
     freq = freq_var.get()
     amplitude = amp_var.get()
     signal_type = signal_var.get()
@@ -145,40 +188,22 @@ def generate_signal(*args):
     freq_label.config(text=f"Fréquence: {freq:.1f} Hz")
     amp_label.config(text=f"Amplitude: {amplitude:.2f}")
 
-    t = np.linspace(0, DURATION, int(SAMPLE_RATE * DURATION), endpoint=False)
-
-    if signal_type == "Sinusoïdal":
-        waveform = amplitude * np.sin(2 * np.pi * freq * t)
-    elif signal_type == "Bruit Blanc":
-        waveform = amplitude * np.random.normal(0, 10, len(t))
-        waveform = apply_lowpass_filter(waveform, freq, SAMPLE_RATE)
-    elif signal_type == "Mixte":
-        sine_wave = amplitude * np.sin(2 * np.pi * freq * t)
-        noise = amplitude * np.random.normal(0, 2, len(t))
-        noise = apply_lowpass_filter(noise, 500, SAMPLE_RATE)
-        waveform = sine_wave + noise
+    t = np.linspace(0, DURATION, int(SAMPLE_RATE * DURATION), endpoint=False, dtype=DTYPE)
+
+    graph = None
+    if signal_type in GRAPH_SIGNALS:
+        # Même graphe pour l'affichage (rendu complet) et pour le flux (bloc par bloc, en boucle)
+        preset = ParamTouch(signal_type, modulation_type, freq, amplitude, DURATION, None, 1.0)
+        graph = compilePreset(preset, SAMPLE_RATE, noise_bank, DTYPE, loop=True, mixteNoiseGain=MIXTE_NOISE_GAIN)
+        waveform = graph.render()
     elif signal_type == "Train d'impulsion":
-        interval = 0.05  # Intervalle entre les impulsions en secondes
-        pulse_duration = 0.01  # Durée de chaque impulsion en secondes
-        waveform = np.zeros_like(t)
-        for i in range(len(t)):
-            if (i / SAMPLE_RATE) % interval < pulse_duration:
-                waveform[i] = amplitude*2
+        # Intervalle de 50 ms entre les impulsions, impulsions de 10 ms
+        waveform = pulseTrain(len(t), SAMPLE_RATE, amplitude*2, interval=0.05, pulseDuration=0.01, numPulses=1, dtype=DTYPE)
         waveform = svf_bandpass(waveform, SAMPLE_RATE, freq, q_factor=2)
     elif signal_type == "Triangulaire":
         waveform = amplitude * (2 * np.abs(2 * (t * freq - np.floor(t * freq + 0.5))) - 1)
     elif signal_type == "Dente de Scie":
         waveform = amplitude * (2 * (t * freq - np.floor(t * freq + 0.5)))
-    elif signal_type == "Tap":
-        interval = 0.5  
-        pulse_duration = 0.01  
-        num_pulses = 3  
-        pulse_spacing = 0.01  
-        waveform = np.zeros_like(t)
-        for i in range(len(t)):
-            for j in range(num_pulses):
-                if (i / SAMPLE_RATE) % interval < pulse_duration + j * pulse_spacing:
-                    waveform[i] = amplitude
     elif signal_type == "Fichier Audio":
         # Ouvrir une boîte de dialogue pour sélectionner un fichier audio
         file_path = filedialog.askopenfilename(
@@ -187,86 +212,46 @@ def generate_signal(*args):
         )
         if file_path:
             try:
-                with wave.open(file_path, 'rb') as wav_file:
-                    # Lire les données audio
-                    num_frames = wav_file.getnframes()
-                    audio_data = wav_file.readframes(num_frames)
-                    audio_signal = np.frombuffer(audio_data, dtype=np.int16)
-                    
-                    # Normaliser et ajuster l'amplitude
-                    waveform = amplitude * (audio_signal / np.max(np.abs(audio_signal)))
-                    waveform = apply_lowpass_filter(waveform, 1000, SAMPLE_RATE)   
-                    
-                    # Ajuster la durée si nécessaire
-                    if len(waveform) > len(t):
-                        waveform = waveform[:len(t)]
-                    elif len(waveform) < len(t):
-                        waveform = np.pad(waveform, (0, len(t) - len(waveform)), 'constant')
+                # Lire les données audio (mono, converties à SAMPLE_RATE et mises en cache par fichier)
+                audio_signal = resampledWav(file_path, SAMPLE_RATE)
+                
+                # Normaliser et ajuster l'amplitude
+                waveform = amplitude * (audio_signal / np.max(np.abs(audio_signal)))
+                waveform = apply_lowpass_filter(waveform, 1000, SAMPLE_RATE)   
+                
+                # Ajuster la durée si nécessaire
+                if len(waveform) > len(t):
+                    waveform = waveform[:len(t)]
+                elif len(waveform) < len(t):
+                    waveform = np.pad(waveform, (0, len(t) - len(waveform)), 'constant')
             except Exception as e:
                 messagebox.showerror("Erreur", f"Impossible de charger le fichier audio : {e}")
                 return
 
-    waveform *= apply_modulation(t, modulation_type)
+    waveform = waveform.astype(DTYPE, copy=False)
+    if graph is None:
+        applyEnvelope(waveform, modulation_type, SAMPLE_RATE)  # En place, tables en cache
+    else:
+        graph.reset()  # Le flux reprend au début du signal
+    live_graph = graph
 
     plot_signal(t, waveform)
 
-def apply_modulation(t, modulation_type):
-    """Applique une modulation au signal selon le type choisi"""
-    if modulation_type == "Aucune":
-        return np.ones_like(t)
-    elif modulation_type == "Sinusoïdale":
-        return 0.5 * (1 - np.cos(2 * np.pi * 2 * t))
-    elif modulation_type == "Exponentielle":
-        return np.exp(-2 * t)  
-    elif modulation_type == "Impulsion":
-        attack_time = 0.01  
-        decay_time = 0.05    
-        mod_signal = np.zeros_like(t)
-        mod_signal[t < attack_time] = t[t < attack_time] / attack_time
-        mod_signal[(t >= attack_time) & (t < attack_time + decay_time)] = 1 - ((t[(t >= attack_time) & (t < attack_time + decay_time)] - attack_time) / decay_time)
-        return mod_signal
-    elif modulation_type == "Créneau":
-        return 0.5 + 0.5 * np.sign(np.sin(2 * np.pi * 2 * t))
-    elif modulation_type == "Logarithmique":
-        return np.log(1 + 5 * t) / np.max(np.log(1 + 5 * t))
-    elif modulation_type == "Fade In/Out":
-        # Modulation de type fade in/out
-        fade_in_time = 0.1  # Temps de fade in
-        fade_out_time = 0.1  # Temps de fade out
-        mod_signal = np.ones_like(t)
-        fade_in = (t < fade_in_time)
-        fade_out = (t > (t[-1] - fade_out_time))
-        mod_signal[fade_in] = t[fade_in] / fade_in_time
-        mod_signal[fade_out] = (t[-1] - t[fade_out]) / fade_out_time
-        return mod_signal
-    
-    return np.ones_like(t)
+    # Synthèse continue : chaque bloc est généré à la demande, sans point de bouclage
+    # (la modulation, calculée sur le buffer de DURATION secondes, n'est pas appliquée)
+    if continuous_var.get() and signal_type in OSCILLATOR_TYPES:
+        noise_std = 2 if signal_type == "Mixte" else 10
+        live_oscillator = Oscillator(SAMPLE_RATE, signal_type, freq, amplitude, noiseStd=noise_std, dtype=DTYPE)
+    else:
+        live_oscillator = None
 
 def svf_bandpass(signal, sample_rate, center_freq, q_factor=1.0):
-    # Initialisation des paramètres du filtre
-    omega = 2 * np.pi * center_freq / sample_rate
-    f = 2 * np.sin(omega) / q_factor   # Fréquence normalisée
-    q = q_factor
-
-    # États internes du filtre
-    low, band = 0.0, 0.0
-    output = np.zeros_like(signal)
-
-    # Application du filtre passe-bande sur chaque échantillon
-    for i, x in enumerate(signal):
-        high = x - low - q * band
-        band = f * high + band
-        low = f * band + low
-        output[i] = band  # Passe-bande
-
-    return output
+    """Filtre passe-bande à variable d'état appliqué au signal complet"""
+    return StateVariableFilter(sample_rate, center_freq, q_factor).process(signal)
 
 def apply_lowpass_filter(data, cutoff, fs, order=5):
     """Applique un filtre passe-bas au signal"""
-    nyquist = 0.5 * fs
-    normal_cutoff = cutoff / nyquist
-    b, a = butter(order, normal_cutoff, btype='low', analog=False)
-    return lfilter(b, a, data)
+    return filterSignal(data, cutoff, fs, order, btype='low')
 
 
 def plot_signal(t, waveform):
@@ -300,7 +285,7 @@ def audio_callback(outdata, frames, time, status):
     if status:
         print(f"Statut audio: {status}")
     
-    if waveform is None:
+    if waveform is None and live_oscillator is None and live_graph is None:
         outdata.fill(0)
         return
     
@@ -308,33 +293,51 @@ def audio_callback(outdata, frames, time, status):
     try:
         pos = buffer_position
         
-        chunk = np.zeros((frames, NUM_CHANNELS))
+        if live_oscillator is not None:
+            # Synthèse à la demande, phase continue d'un bloc à l'autre
+            block = live_oscillator.generate(frames)
+        elif live_graph is not None:
+            # Graphe évalué bloc par bloc, sans buffer de la longueur du signal
+            block = live_graph.generate(frames)
+        else:
+            # Extraire le bloc mono une seule fois (avec bouclage en fin de buffer)
+            end = min(pos + frames, len(waveform))
+            n = end - pos
+            block = np.empty(frames, dtype=DTYPE)
+            block[:n] = waveform[pos:end]
+            if n < frames:
+                block[n:] = waveform[:frames-n]
+        
+        # Le filtre conserve son état d'un bloc à l'autre
+        if live_filter is not None:
+            block = live_filter.process(block)
+        
+        # Gains spatiaux du pattern pour ce bloc, indexés par le nombre d'échantillons joués
+        pattern = live_pattern
+        if pattern is not None:
+            set_port_intensities(pattern.generate(frames))
+        
+        # Écriture directe dans le buffer float32 du stream
+        outdata.fill(0)
         
-        for port in ACTIVE_PORTS:
+        for port in DRIVEN_PORTS:
             if selected_channels[port]:
-                end = min(pos + frames, len(waveform))
-                n = end - pos
-                
-                chunk[:n, port] = waveform[pos:end] * port_intensities[port]
-                
-                if n < frames:
-                    chunk[n:, port] = waveform[:frames-n] * port_intensities[port]
+                smoother = gain_smoothers[port]
+                smoother.setTarget(port_intensities[port])
+                np.multiply(block, smoother.generate(frames), out=outdata[:, port])
         
-        outdata[:] = chunk
-        
-        buffer_position = (pos + frames) % len(waveform)
+        if live_oscillator is None:
+            buffer_position = (pos + frames) % len(waveform)
         
     # Gérer les erreurs d'index    
     except RuntimeError as e:
         print(f"Info: Initialisation du stream... ({e})")
-        chunk = np.zeros((frames, NUM_CHANNELS))
+        outdata.fill(0)
         
-        for port in ACTIVE_PORTS:
+        end = min(frames, len(waveform))
+        for port in DRIVEN_PORTS:
             if selected_channels[port]:
-                end = min(frames, len(waveform))
-                chunk[:end, port] = waveform[:end] * port_intensities[port]
-        
-        outdata[:] = chunk
+                np.multiply(waveform[:end], port_intensities[port], out=outdata[:end, port])
         
         buffer_position = frames % len(waveform)
 
@@ -367,13 +370,18 @@ def play_signal(unity=False):
     try:
         # Réinitialiser la position du buffer au début
         buffer_position = 0
+        if live_filter is not None:
+            live_filter.reset()
+        if live_graph is not None:
+            live_graph.reset()
         
         # Créer un stream avec callback pour faire jouer le son en continu
         stream = sd.OutputStream(
             samplerate=SAMPLE_RATE,
             blocksize=2048,
             device=device_index,
-            channels=NUM_CHANNELS,
+            channels=OUTPUT_CHANNELS,
+            dtype='float32',
             callback=audio_callback
         )
         
@@ -415,11 +423,15 @@ def update_freq(value):
     """Met à jour la valeur de fréquence et le label correspondant"""
     freq_var.set(float(value))
     freq_label.config(text=f"Fréquence: {float(value):.1f} Hz")
+    if live_oscillator is not None:
+        live_oscillator.setFrequency(float(value))  # Appliqué sans saut de phase au bloc suivant
     
 def update_amp(value):
     """Met à jour la valeur d'amplitude et le label correspondant"""
     amp_var.set(float(value))
     amp_label.config(text=f"Amplitude: {float(value):.2f}")
+    if live_oscillator is not None:
+        live_oscillator.setAmplitude(float(value))  # Rampe sur le bloc suivant
 
 def update_sleep_time(value):
     """Met à jour le temps de pause et le label correspondant"""
@@ -464,52 +476,18 @@ def update_intensities_from_position(x, y):
     gamma = max(0, min(1, gamma))
     beta = max(0, min(1, beta))
     
-    # Calculer les intensités pour chaque port
-    Iv = 1  # Intensité de port Fantôme	
-    if gamma < 0.5:
-        alpha = (x - port2_center_x) / (port6_center_x - port2_center_x)
-        I1 = (1 - alpha) * (1 - beta) * Iv
-        I2 = 0
-        I3 = (1-alpha) * beta * Iv
-        I4 = 0
-        I5 = alpha * (1 - beta) * Iv
-        I6 = alpha * beta * Iv
-    elif gamma > 0.5:
-        alpha = (x - port6_center_x) / (port8_center_x - port6_center_x)
-        I1 = 0
-        I2 = alpha * (1 - beta) * Iv
-        I3 = 0
-        I4 = alpha * beta * Iv
-        I5 = (1 - alpha) * (1 - beta) * Iv
-        I6 = (1 - alpha) * beta * Iv
-    elif gamma == 0.5:
-        I1 = 0
-        I2 = 0
-        I3 = 0
-        I4 = 0
-        I5 = (1- beta) * Iv
-        I6 = beta * Iv
-
-    # I1 = (1 - alpha) * (1 - beta) * Iv  # Intensité I1 pour port2
-    # I2 = alpha * (1 - beta) * Iv        # Intensité I2 pour port8
-    # I3 = (1 - alpha) * beta * Iv        # Intensité I3 pour port1
-    # I4 = alpha * beta * Iv              # Intensité I4 pour port7
-    # I5, I6 = get_I5I6(Iv, alpha, beta)  # I5 pour port6, I6 pour port5
-    
-    # Limiter les intensités entre 0 et 1
-    intensities = [max(min(x, 1), 0) for x in [I1, I2, I3, I4, I5, I6]]
-    
-    # Mettre à jour les intensités selon le mapping corrigé
-    port_intensities[ACTIVE_PORTS[INTENSITY_TO_PORT_MAPPING["I1"]]] = intensities[0]  # I1 -> port2
-    port_intensities[ACTIVE_PORTS[INTENSITY_TO_PORT_MAPPING["I2"]]] = intensities[1]  # I2 -> port8
-    port_intensities[ACTIVE_PORTS[INTENSITY_TO_PORT_MAPPING["I3"]]] = intensities[2]  # I3 -> port1
-    port_intensities[ACTIVE_PORTS[INTENSITY_TO_PORT_MAPPING["I4"]]] = intensities[3]  # I4 -> port7
-    port_intensities[ACTIVE_PORTS[INTENSITY_TO_PORT_MAPPING["I5"]]] = intensities[4]  # I5 -> port6
-    port_intensities[ACTIVE_PORTS[INTENSITY_TO_PORT_MAPPING["I6"]]] = intensities[5]  # I6 -> port5
+    # Lecture des intensités dans la table précalculée (actionneurs à 0.1, 0.5 et 0.9 du plan normalisé)
+    set_port_intensities(intensity_grid.sample(0.1 + 0.8 * gamma, 0.1 + 0.8 * beta))
     
     update_port_visualization()
 
 
+def set_port_intensities(intensities):
+    """Répartit les intensités I1 à In sur leurs ports (INTENSITY_PORTS : mapping ou canaux de la disposition)"""
+    for port, intensity in zip(INTENSITY_PORTS, intensities):
+        port_intensities[port] = intensity
+
+
 def update_port_visualization():
     """Met à jour l'affichage visuel des ports et intensités"""
     for i in range(len(actuator_rects)):
@@ -577,7 +555,7 @@ def reset_cursor_and_intensities():
                          cursor_start_x + cursor_size, cursor_start_y + cursor_size)
     
     # Réinitialiser toutes les intensités à 1.0
-    for port in ACTIVE_PORTS:
+    for port in DRIVEN_PORTS:
         port_intensities[port] = 1.0
     
     # Réinitialiser la carte personnalisée des ports
@@ -635,11 +613,6 @@ def on_closing():
     stop_pattern()  
     stop_signal()   
     
-    # Arrêter tous les threads et processus en arrière-plan
-    if pattern_thread and pattern_thread.is_alive():
-        pattern_running = False
-        pattern_thread.join(1)  
-    
     if stream and stream.active:
         stream.stop()
         stream.close()
@@ -651,204 +624,97 @@ def on_closing():
 # ============= FONCTIONS POUR LES PATTERNS =============
 def stop_pattern():
     """Arrête un pattern en cours"""
-    global pattern_thread, pattern_running
-    pattern_running = False
-    if pattern_thread and pattern_thread.is_alive():
-        pattern_thread.join(1)  
-    pattern_thread = None
+    global live_pattern
+    live_pattern = None
     pattern_label.config(text="Pattern: Aucun")
 
 
-def circular_pattern():
-    """Déplace le curseur en cercle"""
-    global pattern_running
-    pattern_running = True
-    pattern_sleep_time = sleep_var.get()
-    
-    center_x = matrix_start_x + matrix_width / 2
-    center_y = matrix_start_y + matrix_height / 2
-    radius = min(matrix_width, matrix_height) / 3
-    angle = 0
-    
-    while pattern_running:
-        angle += 0.05
-        if angle > 2 * math.pi:
-            angle = 0
-            
-        x = center_x + radius * math.cos(angle) - cursor_size/2
-        y = center_y + radius * math.sin(angle) - cursor_size/2
-        
-        root.after(0, lambda x=x, y=y: move_cursor_to(x + cursor_size/2, y + cursor_size/2))
-        time.sleep(pattern_sleep_time)  # Contrôle de la vitesse
-
-
-def zigzag_pattern():
-    """Déplace le curseur en zigzag horizontal"""
-    global pattern_running
-    pattern_running = True
-    pattern_sleep_time = sleep_var.get()
-    
-    min_x = matrix_start_x + cursor_size
-    max_x = matrix_start_x + matrix_width - cursor_size
-    steps = 20
-    step_size = (max_x - min_x) / steps
-    
-    y_positions = [
-        matrix_start_y + matrix_height / 4,
-        matrix_start_y + (matrix_height * 3) / 4
-    ]
-    
-    y_idx = 0
-    direction = 1  # 1 = droite, -1 = gauche
-    x = min_x
-    
-    while pattern_running:
-        x += step_size * direction
-        
-        # Changer de direction aux bords
-        if x >= max_x or x <= min_x:
-            direction *= -1
-            y_idx = (y_idx + 1) % len(y_positions)
-        
-        # Utiliser after pour mettre à jour l'UI depuis le thread principal
-        root.after(0, lambda x=x, y=y_positions[y_idx]: 
-                   move_cursor_to(x + cursor_size/2, y + cursor_size/2))
-        time.sleep(pattern_sleep_time)  # Contrôle de la vitesse
-
-
-def RL_pattern():
-    """Déplace le curseur horizontalement de droite à gauche"""
-    global pattern_running
-    pattern_running = True
-    patternSleepTime = sleep_var.get()
-    
-    min_x = matrix_start_x + cursor_size
-    max_x = matrix_start_x + matrix_width - cursor_size
-    y = matrix_start_y + matrix_height / 2 - cursor_size / 2
-
-    print(max_x, min_x, max_x - min_x)
-    
-    while pattern_running:
-        # Mouvement de droite à gauche
-        for x in np.linspace(max_x, min_x, 20):
-            if not pattern_running:
-                break
-            # Utiliser after pour mettre à jour l'UI depuis le thread principal
-            root.after(0, lambda x=x, y=y: move_cursor_to(x + cursor_size/2, y + cursor_size/2))
-            time.sleep(patternSleepTime)
-
-
-def diagonal_pattern():
-    """Déplace le curseur en diagonale"""
-    global pattern_running
-    pattern_running = True
-    pattern_sleep_time = sleep_var.get()
-    
-    # Points diagonaux
-    points = [
-        (matrix_start_x + cursor_size, matrix_start_y + cursor_size),  # Coin supérieur gauche
-        (matrix_start_x + matrix_width - cursor_size, matrix_start_y + matrix_height - cursor_size),  # Coin inférieur droit
-        (matrix_start_x + cursor_size, matrix_start_y + matrix_height - cursor_size),  # Coin inférieur gauche
-        (matrix_start_x + matrix_width - cursor_size, matrix_start_y + cursor_size),  # Coin supérieur droit
-    ]
-    
-    current_point = 0
-    steps_between_points = 30
-    
-    while pattern_running:
-        start_point = points[current_point]
-        next_point = points[(current_point + 1) % len(points)]
-        
-        for step in range(steps_between_points):
-            if not pattern_running:
-                break
-                
-            progress = step / steps_between_points
-            x = start_point[0] + (next_point[0] - start_point[0]) * progress
-            y = start_point[1] + (next_point[1] - start_point[1]) * progress
-            
-            # Utiliser after pour mettre à jour l'UI depuis le thread principal
-            root.after(0, lambda x=x, y=y: move_cursor_to(x + cursor_size/2, y + cursor_size/2))
-            time.sleep(pattern_sleep_time)  # Contrôle de la vitesse
-        
-        current_point = (current_point + 1) % len(points)
-
-
-def horizon_pattern():
-    """Déplace le curseur horizontalement de gauche à droite puis de droite à gauche"""
-    global pattern_running
-    pattern_running = True
-    patternSleepTime = sleep_var.get()
-    
-    min_x = matrix_start_x + cursor_size
-    max_x = matrix_start_x + matrix_width - cursor_size
-    y = matrix_start_y + matrix_height / 2 - cursor_size / 2
-    
-    while pattern_running:
-        # Mouvement de gauche à droite
-        for x in np.linspace(min_x, max_x, 20):
-            if not pattern_running:
-                break
-            # Utiliser after pour mettre à jour l'UI depuis le thread principal
-            root.after(0, lambda x=x, y=y: move_cursor_to(x + cursor_size/2, y + cursor_size/2))
-            time.sleep(patternSleepTime)
-        
-        # Mouvement de droite à gauche
-        for x in np.linspace(max_x, min_x, 20):
-            if not pattern_running:
-                break
-            # Utiliser after pour mettre à jour l'UI depuis le thread principal
-            root.after(0, lambda x=x, y=y: move_cursor_to(x + cursor_size/2, y + cursor_size/2))
-            time.sleep(patternSleepTime)
-            
-def vertical_pattern():
-    """Déplace le curseur de haut en bas puis de bas en haut"""
-    global pattern_running
-    pattern_running = True
-    patternSleepTime = sleep_var.get()
-    
-    min_y = matrix_start_y + cursor_size
-    max_y = matrix_start_y + matrix_height - cursor_size
-    x = matrix_start_x + matrix_width / 2 - cursor_size / 2
-    
-    while pattern_running:
-        # Mouvement de haut en bas
-        for y in np.linspace(min_y, max_y, 20):
-            if not pattern_running:
-                break
-            # Utiliser after pour mettre à jour l'UI depuis le thread principal
-            root.after(0, lambda x=x, y=y: move_cursor_to(x + cursor_size/2, y + cursor_size/2))
-            time.sleep(patternSleepTime)
-        
-        # Mouvement de bas en haut
-        for y in np.linspace(max_y, min_y, 20):
-            if not pattern_running:
-                break
-            # Utiliser after pour mettre à jour l'UI depuis le thread principal
-            root.after(0, lambda x=x, y=y: move_cursor_to(x + cursor_size/2, y + cursor_size/2))
-            time.sleep(patternSleepTime)
-
+def canvas_to_normalized(x, y):
+    """Centres de curseur (pixels du canvas) -> positions (m, 2) du plan normalisé des actionneurs"""
+    # Centres des ports 2 (haut gauche), 8 (haut droite) et 1 (bas gauche), comme update_intensities_from_position
+    port2_x = matrix_start_x + actuator_size / 2
+    port2_y = matrix_start_y + actuator_size / 2
+    port8_x = port2_x + 2 * (actuator_size + spacing)
+    port1_y = port2_y + actuator_size + spacing
+    gamma = np.clip((np.asarray(x, dtype=np.float64) - port2_x) / (port8_x - port2_x), 0, 1)
+    beta = np.clip((np.asarray(y, dtype=np.float64) - port2_y) / (port1_y - port2_y), 0, 1)
+    return np.column_stack((0.1 + 0.8 * np.ravel(gamma), 0.1 + 0.8 * np.ravel(beta)))
+
+
+def normalized_to_canvas(x, y):
+    """Position du plan normalisé -> centre du curseur sur le canvas"""
+    port2_x = matrix_start_x + actuator_size / 2
+    port2_y = matrix_start_y + actuator_size / 2
+    return (port2_x + (x - 0.1) / 0.8 * 2 * (actuator_size + spacing),
+            port2_y + (y - 0.1) / 0.8 * (actuator_size + spacing))
+
+
+def gui_pattern_positions(pattern_name, step_time):
+    """Position continue (plan normalisé) d'un pattern de l'interface
+
+    Mêmes formes que les anciennes boucles, un pas toutes les step_time secondes.
+    Renvoie une fonction vectorisée secondes -> positions (m, 2).
+    """
+    step_time = max(step_time, MIN_PATTERN_STEP)
+    half = cursor_size / 2
+    min_x = matrix_start_x + cursor_size + half
+    max_x = matrix_start_x + matrix_width - cursor_size + half
+    min_y = matrix_start_y + cursor_size + half
+    max_y = matrix_start_y + matrix_height - cursor_size + half
+    mid_x = matrix_start_x + matrix_width / 2
+    mid_y = matrix_start_y + matrix_height / 2
+
+    if pattern_name == "Circulaire":
+        radius = min(matrix_width, matrix_height) / 3
+
+        def position_at(seconds):
+            angle = 0.05 * (np.asarray(seconds, dtype=np.float64) / step_time + 1)
+            return canvas_to_normalized(mid_x + radius * np.cos(angle), mid_y + radius * np.sin(angle))
+        return position_at
+
+    # Autres patterns : images clés (pas, x, y) en pixels, reliées linéairement et jouées en boucle
+    zigzag_y = (matrix_start_y + matrix_height / 4 + half, matrix_start_y + matrix_height * 3 / 4 + half)
+    zigzag_step = (max_x - min_x) / 20
+    corners = [(min_x, min_y), (max_x, max_y), (min_x, max_y), (max_x, min_y)]
+    keyframes = {
+        # Changement de ligne au pas où le curseur atteint un bord
+        "Zigzag": [(0, min_x + zigzag_step, zigzag_y[0]), (18, max_x - zigzag_step, zigzag_y[0]), (19, max_x, zigzag_y[1]),
+                   (38, min_x + zigzag_step, zigzag_y[1]), (39, min_x, zigzag_y[0]), (40, min_x + zigzag_step, zigzag_y[0])],
+        "DroiteGauche": [(0, max_x, mid_y), (19, min_x, mid_y), (20, min_x, mid_y)],
+        "Diagonal": [(30 * i, x, y) for i, (x, y) in enumerate(corners + corners[:1])],
+        "Horizontal": [(0, min_x, mid_y), (19, max_x, mid_y), (20, max_x, mid_y), (39, min_x, mid_y), (40, min_x, mid_y)],
+        "Vertical": [(0, mid_x, min_y), (19, mid_x, max_y), (20, mid_x, max_y), (39, mid_x, min_y), (40, mid_x, min_y)],
+    }[pattern_name]
+    # Interpolation en pixels (coordonnées relatives à la matrice), puis conversion comme pour la souris
+    trajectory = Trajectory([{"t": step * step_time, "x": (x - matrix_start_x) / matrix_width, "y": (y - matrix_start_y) / matrix_height}
+                             for step, x, y in keyframes], "linear")
+    matrix_positions = trajectoryPositions(trajectory)
+
+    def position_at(seconds):
+        u = matrix_positions(seconds)
+        return canvas_to_normalized(matrix_start_x + u[:, 0] * matrix_width, matrix_start_y + u[:, 1] * matrix_height)
+    return position_at
+
+
+def follow_pattern(pattern):
+    """Suit le pattern à l'écran : le curseur affiche la position calculée par le callback audio"""
+    if live_pattern is not pattern:
+        return  # Pattern arrêté ou remplacé
+    x, y = normalized_to_canvas(*pattern.position)
+    actuator_canvas.coords(cursor_rect, x - cursor_size / 2, y - cursor_size / 2, x + cursor_size / 2, y + cursor_size / 2)
+    update_port_visualization()
+    root.after(PATTERN_DISPLAY_MS, follow_pattern, pattern)
 
 
 def start_pattern(pattern_name):
-    """Démarre un pattern de mouvement"""
-    global pattern_thread, pattern_running, current_pattern
+    """Démarre un pattern de mouvement, cadencé par le callback audio (pas de thread)"""
+    global live_pattern, current_pattern
     
     # Arrêter tout pattern en cours
     stop_pattern()
     
-    # Définir le nouveau pattern
-    patterns = {
-        "Circulaire": circular_pattern,
-        "Zigzag": zigzag_pattern,
-        "DroiteGauche": RL_pattern,
-        "Diagonal": diagonal_pattern,
-        "Horizontal": horizon_pattern,
-        "Vertical": vertical_pattern
-    }
-    
     # Vérifier si le pattern existe
-    if pattern_name not in patterns:
+    if pattern_name not in GUI_PATTERNS:
         messagebox.showerror("Erreur", f"Pattern '{pattern_name}' non reconnu")
         return
         
@@ -856,11 +722,9 @@ def start_pattern(pattern_name):
     current_pattern = pattern_name
     pattern_label.config(text=f"Pattern: {pattern_name}")
     
-    # Démarrer le thread du pattern
-    pattern_running = True
-    pattern_thread = threading.Thread(target=patterns[pattern_name])
-    pattern_thread.daemon = True
-    pattern_thread.start()
+    # Les gains avancent avec les échantillons joués : le pattern progresse pendant la lecture
+    live_pattern = PatternFrameGenerator(gui_pattern_positions(pattern_name, sleep_var.get()), SAMPLE_RATE, intensity_grid)
+    follow_pattern(live_pattern)
     
 # ============= INTERFACE GRAPHIQUE =============
 # Initialisation de la fenêtre principale
@@ -930,10 +794,15 @@ signal_menu = ttk.Combobox(signal_frame, textvariable=signal_var, values=signal_
 signal_menu.pack(fill=tk.X, pady=5)
 
 ttk.Label(signal_frame, text="Type de Modulation:").pack(anchor=tk.W)
-modulation_types = ["Aucune", "Sinusoïdale", "Exponentielle", "Impulsion", "Créneau", "Logarithmique","Fade In/Out"]
+modulation_types = list(ENVELOPE_TYPES)
 mod_menu = ttk.Combobox(signal_frame, textvariable=mod_var, values=modulation_types, state="readonly")
 mod_menu.pack(fill=tk.X, pady=5)
 
+# Synthèse continue (oscillateur à phase continue au lieu d'un buffer bouclé)
+continuous_var = tk.BooleanVar(value=False)
+ttk.Checkbutton(signal_frame, text="Synthèse continue (sans boucle)", variable=continuous_var,
+                command=generate_signal).pack(anchor=tk.W, pady=5)
+
 # Slider pour la fréquence
 freq_label = ttk.Label(signal_frame, text=f"Fréquence: {freq_var.get():.1f} Hz")
 freq_label.pack(anchor=tk.W, pady=(10, 0))
@@ -1052,8 +921,7 @@ sleep_slider.pack(fill=tk.X, pady=5)
 pattern_buttons_frame = ttk.Frame(pattern_frame)
 pattern_buttons_frame.pack(fill=tk.X, pady=5)
 
-patterns = ["Circulaire", "Zigzag", "DroiteGauche", "Diagonal", "Horizontal", "Vertical"]
-for i, pattern in enumerate(patterns):
+for i, pattern in enumerate(GUI_PATTERNS):
     btn = ttk.Button(pattern_buttons_frame, text=pattern, 
                     command=lambda p=pattern: start_pattern(p))
     btn.grid(row=i//3, column=i%3, padx=5, pady=5, sticky=tk.EW)
@@ -0,0 +1,139 @@
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from signalSynth import SignalSynth
+from pulseTrain import pulseTrain
+from envelopes import applyEnvelope
+from renderCache import presetFingerprint
+from signalGraph import MIXTE_NOISE_CUTOFF
+
+# Familles de signaux calculables ensemble sous forme de tableaux 2-D
+VECTORIZED_SIGNALS = ("Sinusoïdale", "Tap", "Bruit Blanc", "Mixte")
+
+
+def _renderGroup(synth, presets, numSamples, rate):
+    """Rend un groupe de presets de même famille et de même longueur en une passe 2-D, à `rate`"""
+    signal = presets[0].signal
+    duration = presets[0].duration
+    t = np.linspace(0, duration, numSamples, endpoint=False, dtype=synth.dtype)
+    amps = np.array([p.amp for p in presets], dtype=synth.dtype)[:, None]
+    freqs = np.array([p.freq for p in presets], dtype=synth.dtype)[:, None]
+
+    if signal == "Sinusoïdale":
+        # Calcul en place dans un seul tableau (n_presets, numSamples)
+        waveforms = np.multiply(2 * np.pi * freqs, t)
+        np.sin(waveforms, out=waveforms)
+        waveforms *= amps
+    elif signal == "Tap":
+        # Le train d'impulsions ne dépend que de la longueur : calculé une fois
+        waveforms = amps * pulseTrain(numSamples, rate, 1.0, interval=0.5, pulseDuration=0.01,
+                                      numPulses=3, pulseSpacing=0.01, dtype=synth.dtype)
+    else:
+        waveforms = np.empty((len(presets), numSamples), dtype=synth.dtype)
+        for row, preset in enumerate(presets):
+            cutoff = preset.freq if signal == "Bruit Blanc" else MIXTE_NOISE_CUTOFF
+            waveforms[row] = synth.noiseSegment(cutoff, numSamples, rate, getattr(preset, 'seed', None))
+        waveforms *= amps * 10
+        if signal == "Mixte":
+            sinWaves = np.multiply(2 * np.pi * freqs, t)
+            np.sin(sinWaves, out=sinWaves)
+            sinWaves *= amps
+            waveforms += sinWaves
+
+    # Enveloppe appliquée en place, par type de modulation présent dans le groupe
+    modulations = [p.modulation for p in presets]
+    if len(set(modulations)) == 1:
+        applyEnvelope(waveforms, modulations[0], rate)
+    else:
+        for row, modulationType in enumerate(modulations):
+            applyEnvelope(waveforms[row], modulationType, rate)
+
+    return t, waveforms
+
+
+def _renderSingle(synth, preset):
+    # Instance propre à chaque tâche : SignalSynth garde l'état du dernier rendu
+    # Rendu à la fréquence de synthèse, sans suréchantillonnage (fait par render_batch)
+    worker = SignalSynth(synth.sampleRate, cacheBytes=0, dtype=synth.dtype, internalRate=synth.internalRate)
+    worker.noiseBanks = synth.noiseBanks
+    return worker.renderPreset(preset)
+
+
+def render_batch(presets, synth=None, maxWorkers=None):
+    """Rend une liste de ParamTouch et renvoie {preset: (t, waveform)}
+
+    Les presets synthétiques de même famille et de même durée sont calculés ensemble ;
+    les autres (fichiers WAV, types inconnus) sont rendus en parallèle par un pool de threads.
+    Si `synth` est fourni, sa fréquence, sa précision et ses caches sont utilisés et alimentés.
+    """
+    if synth is None:
+        synth = SignalSynth(cacheBytes=0)
+
+    results = {}
+    groups = {}
+    singles = []
+    for preset in presets:
+        if preset in results:
+            continue
+        key = None
+        if synth.renderCache is not None or synth.diskCache is not None:
+            key = presetFingerprint(preset, synth.sampleRate, synth.dtype, renderRate=synth.renderRate(preset))
+            cached = synth.loadCachedRender(key) if key is not None else None
+            if cached is not None:
+                t, waveform, rate, preset.duration = cached
+                results[preset] = synth.upsample(t, waveform, rate, preset.duration)
+                continue
+
+        if not os.path.isfile(preset.signal) and preset.signal in VECTORIZED_SIGNALS:
+            rate = synth.renderRate(preset)
+            numSamples = int(rate * preset.duration)
+            groups.setdefault((preset.signal, rate, numSamples), []).append((preset, key))
+        else:
+            singles.append((preset, key))
+        results[preset] = None
+
+    for (_, rate, numSamples), members in groups.items():
+        t, waveforms = _renderGroup(synth, [p for p, _ in members], numSamples, rate)
+        for row, (preset, key) in enumerate(members):
+            results[preset] = synth.upsample(t, waveforms[row], rate, preset.duration)
+            if key is not None:
+                synth.storeCachedRender(key, t, waveforms[row], preset.duration, rate)
+
+    if singles:
+        with ThreadPoolExecutor(max_workers=maxWorkers) as pool:
+            futures = [(preset, key, pool.submit(_renderSingle, synth, preset)) for preset, key in singles]
+            for preset, key, future in futures:
+                t, waveform, rate = future.result()
+                results[preset] = synth.upsample(t, waveform, rate, preset.duration)
+                if key is not None:
+                    synth.storeCachedRender(key, t, waveform, preset.duration, rate)
+
+    return results
+
+
+if __name__ == "__main__":
+    # Benchmark : rendu un par un vs rendu groupé de variantes de presets
+    from presetTouch import ParamTouch
+
+    variants = []
+    for i in range(12):
+        variants.append(ParamTouch("Sinusoïdale", "Fade In/Out", 50.0 + 10 * i, 0.1, 2.0, None, 1.0))
+        variants.append(ParamTouch("Tap", "Aucune", 150.0, 0.05 + 0.01 * i, 2.0, None, 1.0))
+        variants.append(ParamTouch("Mixte", "Impulsion", 100.0 + 5 * i, 0.1, 2.0, None, 1.0, seed=i))
+
+    synth = SignalSynth(cacheBytes=0)
+    render_batch(variants[:3], synth)  # Échauffement
+    start = time.perf_counter()
+    sequential = {p: synth.configureSignalFromPreset(p)[1].copy() for p in variants}
+    seqTime = time.perf_counter() - start
+
+    start = time.perf_counter()
+    batch = render_batch(variants, synth)
+    batchTime = time.perf_counter() - start
+
+    maxError = max(np.max(np.abs(sequential[p] - batch[p][1])) for p in variants)
+    print(f"{len(variants)} presets : un par un {seqTime * 1e3:.1f} ms, groupé {batchTime * 1e3:.1f} ms "
+          f"(x{seqTime / batchTime:.1f}), écart max {maxError:.2e}")
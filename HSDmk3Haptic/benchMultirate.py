@@ -0,0 +1,65 @@
+import os
+import tempfile
+import time
+
+import numpy as np
+from scipy.io import wavfile
+
+from signalSynth import SignalSynth
+from presetTouch import ParamTouch
+
+# Benchmark : synthèse à 48 kHz vs synthèse à 4 kHz suréchantillonnée une fois à la fin
+SAMPLE_RATE = 48000
+INTERNAL_RATE = 4000
+REPEATS = 10
+
+
+def makePresets(wavPath):
+    return {
+        "Sinusoïdale": ParamTouch("Sinusoïdale", "Fade In/Out", 150.0, 0.1, 4.0, None, 1.0),
+        "Bruit Blanc": ParamTouch("Bruit Blanc", "Fade In/Out", 250.0, 0.2, 4.0, None, 1.0, seed=1),
+        "Tap": ParamTouch("Tap", "Aucune", 150.0, 0.1, 4.0, None, 1.0),
+        "Mixte": ParamTouch("Mixte", "Impulsion", 150.0, 0.1, 4.0, None, 1.0, seed=1),
+        "WAV 44.1 kHz": ParamTouch(wavPath, "Aucune", 50.0, 0.5, 4.0, None, 1.0),
+    }
+
+
+def measure(synth, preset):
+    synth.configureSignalFromPreset(preset)  # Échauffement (filtres, tables de bruit)
+    start = time.perf_counter()
+    for _ in range(REPEATS):
+        _, waveform = synth.configureSignalFromPreset(preset)
+    elapsed = (time.perf_counter() - start) / REPEATS
+    clipBytes = synth.renderPreset(preset)[1].nbytes  # Taille du rendu mis en cache
+    return elapsed, clipBytes, waveform
+
+
+if __name__ == "__main__":
+    directory = tempfile.mkdtemp()
+    wavPath = os.path.join(directory, "bench.wav")
+    wavfile.write(wavPath, 44100, (np.random.normal(0, 3000, (44100 * 4, 2))).astype(np.int16))
+
+    full = SignalSynth(SAMPLE_RATE, cacheBytes=0)
+    multirate = SignalSynth(SAMPLE_RATE, cacheBytes=0, internalRate=INTERNAL_RATE)
+
+    print(f"{'Preset':<14}{'rendu (Hz)':>11}{'48 kHz (ms)':>13}{'interne (ms)':>14}{'calcul':>8}{'cache 48k (ko)':>16}{'interne (ko)':>14}"
+          f"{'cache':>7}{'écart type':>20}")
+    for name, preset in makePresets(wavPath).items():
+        tFull, bytesFull, reference = measure(full, preset)
+        tMulti, bytesMulti, upsampled = measure(multirate, preset)
+        n = min(len(reference), len(upsampled))
+        print(f"{name:<14}{multirate.renderRate(preset):>11}{tFull * 1e3:>13.2f}{tMulti * 1e3:>14.2f}{tFull / tMulti:>7.1f}x{bytesFull / 1e3:>16.0f}"
+              f"{bytesMulti / 1e3:>14.0f}{bytesFull / bytesMulti:>6.0f}x{np.std(reference[:n]):>10.4f} / {np.std(upsampled[:n]):.4f}")
+
+    # Signal déterministe : écart à la synthèse pleine fréquence (hors bords du filtre)
+    sine = ParamTouch("Sinusoïdale", "Aucune", 150.0, 0.1, 1.0, None, 1.0)
+    _, reference = full.configureSignalFromPreset(sine)
+    _, upsampled = multirate.configureSignalFromPreset(sine)
+    margin = SAMPLE_RATE // 100
+    print(f"Sinusoïde 150 Hz : écart max {np.max(np.abs(reference - upsampled)[margin:-margin]):.2e}")
+
+    # Tap : toujours rendu à la fréquence de sortie, fronts des impulsions intacts
+    tap = makePresets(wavPath)["Tap"]
+    _, reference = full.configureSignalFromPreset(tap)
+    _, rendered = multirate.configureSignalFromPreset(tap)
+    print(f"Tap : rendu à {multirate.renderRate(tap)} Hz, écart max {np.max(np.abs(reference - rendered)):.2e}")
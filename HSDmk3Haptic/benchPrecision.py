@@ -0,0 +1,62 @@
+import os
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+from scipy.io import wavfile
+
+from signalSynth import SignalSynth
+from presetTouch import ParamTouch
+from channelRouting import parseMapping, routeActive
+from trajectory import compileTrajectory
+
+# Benchmark float64 vs float32 : rendu SignalSynth puis routage des canaux actifs comme PlaySignal
+ACTIVE_PORTS = [0, 1, 4, 5, 6, 7]
+MAPPING_INTENSITY = {"I1": 1, "I2": 5, "I3": 0, "I4": 4, "I5": 3, "I6": 2}
+LOG_INTENSITY, _ = compileTrajectory("Circulaire", 200)
+ROWS, _ = parseMapping(MAPPING_INTENSITY, ACTIVE_PORTS, LOG_INTENSITY.shape[0])
+REPEATS = 5
+
+
+def makePresets(wavPath):
+    return {
+        "Sinusoïdale": ParamTouch("Sinusoïdale", "Fade In/Out", 100.0, 0.1, 4.0, None, 1.0),
+        "Bruit Blanc": ParamTouch("Bruit Blanc", "Aucune", 250.0, 0.1, 4.0, None, 1.0, seed=1),
+        "Tap": ParamTouch("Tap", "Aucune", 150.0, 0.1, 4.0, None, 1.0),
+        "Mixte": ParamTouch("Mixte", "Impulsion", 150.0, 0.1, 4.0, None, 1.0, seed=1),
+        "WAV 44.1 kHz": ParamTouch(wavPath, "Aucune", 50.0, 0.5, 4.0, None, 1.0),
+    }
+
+
+def renderAndRoute(synth, preset):
+    _, waveform = synth.configureSignalFromPreset(preset)
+    return routeActive(waveform, LOG_INTENSITY, ROWS)
+
+
+def measure(dtype, preset):
+    synth = SignalSynth(cacheBytes=0, dtype=dtype)
+    renderAndRoute(synth, preset)  # Échauffement (caches de conception des filtres)
+
+    start = time.perf_counter()
+    for _ in range(REPEATS):
+        renderAndRoute(synth, preset)
+    elapsed = (time.perf_counter() - start) / REPEATS
+
+    tracemalloc.start()
+    signal = renderAndRoute(synth, preset)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak, signal.nbytes
+
+
+if __name__ == "__main__":
+    directory = tempfile.mkdtemp()
+    wavPath = os.path.join(directory, "bench.wav")
+    wavfile.write(wavPath, 44100, (np.random.normal(0, 3000, (44100 * 4, 2))).astype(np.int16))
+
+    print(f"{'Preset':<14}{'float64 (ms)':>14}{'float32 (ms)':>14}{'pic f64 (Mo)':>14}{'pic f32 (Mo)':>14}")
+    for name, preset in makePresets(wavPath).items():
+        t64, peak64, _ = measure(np.float64, preset)
+        t32, peak32, _ = measure(np.float32, preset)
+        print(f"{name:<14}{t64 * 1e3:>14.1f}{t32 * 1e3:>14.1f}{peak64 / 1e6:>14.1f}{peak32 / 1e6:>14.1f}")
@@ -0,0 +1,162 @@
+import time
+
+import numpy as np
+
+
+def parseMapping(mappingIntensity, activePorts, numIntensities):
+    """Analyse une seule fois le mapping {"I1": index dans activePorts, ...}
+
+    Renvoie (lignes du log, canaux physiques) en tableaux d'indices ; les entrées invalides
+    sont signalées puis ignorées, comme dans l'ancienne boucle. Un canal visé deux fois
+    garde la dernière intensité (l'ancienne boucle l'écrasait de la même façon).
+    """
+    rows, channels = [], []
+    for keyIntensity, indexPort in mappingIntensity.items():
+        try:
+            indexIntensity = int(keyIntensity[1:]) - 1
+            if not 0 <= indexIntensity < numIntensities:
+                print(f"Avertissement: Indice d'intensité {indexIntensity} hors limites pour {keyIntensity}")
+                continue
+            channel = activePorts[indexPort]
+        except (ValueError, IndexError) as e:
+            print(f"Erreur lors du traitement de {keyIntensity}: {e}")
+            continue
+        if channel in channels:
+            rows[channels.index(channel)] = indexIntensity
+            continue
+        rows.append(indexIntensity)
+        channels.append(channel)
+    return np.array(rows, dtype=np.intp), np.array(channels, dtype=np.intp)
+
+
+def layoutMapping(layout):
+    """Routage d'une ActuatorLayout : ligne i du log -> layout.channels[i], pour tous ses actionneurs"""
+    return np.arange(len(layout), dtype=np.intp), np.array(layout.channels, dtype=np.intp)
+
+
+def stepBounds(numSteps, numSamples):
+    """Limites des pas du log sur le signal : le pas k couvre [bounds[k], bounds[k + 1]), sans reste"""
+    return np.arange(numSteps + 1) * numSamples // numSteps
+
+
+def expandLog(logIntensity, numSamples, interpolate=False, dtype=np.float64, samplesFirst=False):
+    """Log (lignes, pas) étendu à la résolution de l'échantillon : (lignes, numSamples)
+
+    Par défaut chaque pas est tenu (np.repeat) ; interpolate=True relie linéairement
+    les centres des pas (pas de marches audibles entre deux pas).
+    samplesFirst=True : (numSamples, lignes), construit directement dans cet ordre (C-contigu).
+    """
+    logIntensity = np.asarray(logIntensity, dtype=dtype)
+    numSteps = logIntensity.shape[1]
+    table, axis = (logIntensity.T, 0) if samplesFirst else (logIntensity, 1)
+    if not interpolate:
+        return np.repeat(table, np.diff(stepBounds(numSteps, numSamples)), axis=axis)
+    position = (np.arange(numSamples) + 0.5) * (numSteps / numSamples) - 0.5
+    np.clip(position, 0, numSteps - 1, out=position)
+    lower = position.astype(np.intp)
+    upper = np.minimum(lower + 1, numSteps - 1)
+    frac = (position - lower).astype(dtype)
+    if samplesFirst:
+        frac = frac[:, None]
+    return np.take(table, lower, axis=axis) * (1 - frac) + np.take(table, upper, axis=axis) * frac
+
+
+def routeSignal(waveform, logIntensity, rows, channels, numChannels, interpolate=False):
+    """Signal (échantillons, numChannels) : chaque canal reçoit waveform × sa ligne du log
+
+    Une seule multiplication diffusée sur toute la longueur du signal. Le tampon est rangé
+    canal par canal (chaque canal contigu) et renvoyé transposé : même forme que l'ancienne
+    boucle, sans écriture dispersée dans des colonnes entrelacées.
+    """
+    gains = expandLog(logIntensity[rows], len(waveform), interpolate, waveform.dtype)
+    signal = np.zeros((numChannels, len(waveform)), dtype=waveform.dtype)
+    signal[channels] = gains * waveform
+    return signal.T
+
+
+def routeActive(waveform, logIntensity, rows, interpolate=False):
+    """Signal des seuls canaux actifs : (échantillons, len(rows)), colonne i pour la ligne rows[i]
+
+    Les canaux physiques sont atteints par le `mapping` de sounddevice (outputMapping) :
+    la mémoire dépend du nombre d'actionneurs, pas du nombre de sorties du périphérique.
+    Le tampon est construit échantillon par échantillon (C-contigu) : sounddevice l'envoie
+    sans copie supplémentaire.
+    """
+    gains = expandLog(logIntensity[rows], len(waveform), interpolate, waveform.dtype, samplesFirst=True)
+    gains *= waveform[:, None]
+    return gains
+
+
+def outputMapping(channels):
+    """Canaux physiques (indices à partir de 0) -> mapping sounddevice (numérotation à partir de 1)"""
+    return [int(channel) + 1 for channel in channels]
+
+
+def routeSignalLoop(waveform, logIntensity, mappingIntensity, activePorts, numChannels):
+    """Version de référence (ancienne boucle de PlaySignal.signalWithIntensities)"""
+    waveformSample = len(waveform) // logIntensity.shape[1]
+    signal = np.zeros((len(waveform), numChannels), dtype=waveform.dtype)
+
+    for step in range(logIntensity.shape[1]):
+        start = step * waveformSample
+        end = start + waveformSample
+
+        for keyIntensity, indexPort in mappingIntensity.items():
+            indexIntensity = int(keyIntensity[1:]) - 1
+            if indexIntensity >= 0 and indexIntensity < logIntensity.shape[0]:
+                actualChannel = activePorts[indexPort]
+                stepIntensity = logIntensity[indexIntensity, step]
+                signal[start:end, actualChannel] = waveform[start:end] * stepIntensity
+    return signal
+
+
+if __name__ == "__main__":
+    # Benchmark : boucle par pas et par port vs routage vectorisé
+    from trajectory import compileTrajectory
+
+    sampleRate = 48000
+    activePorts = [0, 1, 4, 5, 6, 7]
+    mappingIntensity = {"I1": 1, "I2": 5, "I3": 0, "I4": 4, "I5": 3, "I6": 2}
+    rows, channels = parseMapping(mappingIntensity, activePorts, 6)
+
+    def bestTime(route, repeats=5, runs=10):
+        # Meilleur temps moyen sur `repeats` séries de `runs` appels, et dernier résultat
+        best = float("inf")
+        for _ in range(repeats):
+            start = time.perf_counter()
+            for _ in range(runs):
+                result = route()
+            best = min(best, (time.perf_counter() - start) / runs)
+        return best, result
+
+    def transposedRoute():
+        # Ancienne construction (lignes, échantillons) puis transposée : vue non contiguë,
+        # recopiée avant l'envoi à sounddevice ; la copie est comptée ici
+        gains = expandLog(logIntensity[rows], len(waveform), False, waveform.dtype)
+        gains *= waveform
+        return np.ascontiguousarray(gains.T)
+
+    for duration, nPattern in ((2.0, 200), (2.0, 2000), (3.71, 200)):
+        waveform = np.random.normal(0, 0.1, int(sampleRate * duration)).astype(np.float32)
+        logIntensity, _ = compileTrajectory("Circulaire", nPattern)
+
+        start = time.perf_counter()
+        reference = routeSignalLoop(waveform, logIntensity, mappingIntensity, activePorts, 20)
+        loopTime = time.perf_counter() - start
+
+        vecTime, signal = bestTime(lambda: routeSignal(waveform, logIntensity, rows, channels, 20))
+        activeTime, active = bestTime(lambda: routeActive(waveform, logIntensity, rows))
+        activeError = np.max(np.abs(active - signal[:, channels]))
+        transposedTime, _ = bestTime(transposedRoute)
+
+        covered = len(waveform) // nPattern * nPattern
+        if covered == len(waveform):
+            detail = f"écart max {np.max(np.abs(signal - reference)):.1e}"
+        else:
+            detail = (f"{len(waveform) - covered} échantillons de fin muets avec la boucle, "
+                      f"couverts ici (pas répartis sur tout le signal, écart max sur le reste {np.max(np.abs(signal[:covered] - reference[:covered])):.1e})")
+        print(f"{duration} s, {nPattern} pas : boucle {loopTime * 1e3:.1f} ms, vectorisé {vecTime * 1e3:.2f} ms "
+              f"(x{loopTime / vecTime:.0f}), {detail}")
+        print(f"    canaux actifs seuls : {activeTime * 1e3:.2f} ms, {active.nbytes / 2**20:.1f} Mio "
+              f"au lieu de {signal.nbytes / 2**20:.1f} Mio (x{signal.nbytes / active.nbytes:.1f}), écart {activeError:.1e}, "
+              f"C-contigu {active.flags['C_CONTIGUOUS']} (transposé + copie : {transposedTime * 1e3:.2f} ms)")
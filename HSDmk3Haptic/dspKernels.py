@@ -0,0 +1,224 @@
+import math
+import os
+import time
+
+import numpy as np
+from scipy.signal import lfilter
+
+# Noyaux DSP récursifs : compilés par Numba s'il est installé, sinon équivalents NumPy/SciPy.
+# Les versions compilées sont mises en cache sur disque (__pycache__) : seul le premier
+# lancement paie la compilation. HSD_NO_NUMBA=1 force les versions NumPy.
+try:
+    from numba import njit
+    HAVE_NUMBA = True
+except ImportError:
+    HAVE_NUMBA = False
+
+USE_NUMBA = HAVE_NUMBA and os.environ.get("HSD_NO_NUMBA") != "1"
+
+
+def _jit(func):
+    # Compilation paresseuse au premier appel, cache disque entre deux lancements
+    return njit(cache=True, nogil=True)(func) if USE_NUMBA else func
+
+
+def onePoleCoeff(timeConstant, sampleRate):
+    """Coefficient d'un lissage à un pôle de constante de temps `timeConstant` (s)"""
+    if timeConstant <= 0:
+        return 1.0
+    return 1.0 - math.exp(-1.0 / (timeConstant * sampleRate))
+
+
+# --- Boucles échantillon par échantillon (compilées si Numba est disponible) ---
+
+@_jit
+def svfBandpassLoop(x, f, q, low, band):
+    out = np.empty(x.shape[0])
+    for i in range(x.shape[0]):
+        high = x[i] - low - q * band
+        band = f * high + band
+        low = f * band + low
+        out[i] = band
+    return out, low, band
+
+
+@_jit
+def onePoleLoop(x, coeff, state):
+    out = np.empty(x.shape[0])
+    for i in range(x.shape[0]):
+        state += coeff * (x[i] - state)
+        out[i] = state
+    return out, state
+
+
+@_jit
+def peakFollowerLoop(x, release, state):
+    out = np.empty(x.shape[0])
+    for i in range(x.shape[0]):
+        level = abs(x[i])
+        state *= release
+        if level > state:
+            state = level
+        out[i] = state
+    return out, state
+
+
+# --- Équivalents vectorisés ---
+
+def svfBandpassNumpy(x, f, q, low, band):
+    """Sortie passe-bande du SVF par lfilter ; renvoie (band, low, band) comme la boucle"""
+    x = np.asarray(x, dtype=np.float64)
+    if len(x) == 0:
+        return np.zeros(0), low, band
+    # band[n] = f * (x[n] - x[n-1]) + (2 - f*q - f^2) * band[n-1] - (1 - f*q) * band[n-2]
+    b = [f, -f, 0.0]
+    a = [1.0, -(2 - f * q - f * f), 1 - f * q]
+    zi = [-f * low + (1 - f * q) * band, -(1 - f * q) * band]
+    out, _ = lfilter(b, a, x, zi=zi)
+    return out, low + f * np.sum(out), float(out[-1])
+
+
+def onePoleNumpy(x, coeff, state):
+    """y[n] = y[n-1] + coeff * (x[n] - y[n-1]) par lfilter"""
+    x = np.asarray(x, dtype=np.float64)
+    if len(x) == 0:
+        return np.zeros(0), state
+    out, _ = lfilter([coeff], [1.0, coeff - 1.0], x, zi=[(1.0 - coeff) * state])
+    return out, float(out[-1])
+
+
+def peakFollowerNumpy(x, release, state):
+    """Suiveur de crête (attaque instantanée, décroissance exponentielle)
+
+    env[n] = max(|x[n]|, release * env[n-1]) = release^n * max_k(|x[k]| / release^k) :
+    un maximum cumulé dans le domaine logarithmique.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    if len(x) == 0:
+        return np.zeros(0), state
+    logRelease = math.log(release)
+    k = np.arange(-1, len(x))
+    with np.errstate(divide='ignore'):
+        levels = np.log(np.concatenate(([state], np.abs(x))))
+    levels -= k * logRelease
+    np.maximum.accumulate(levels, out=levels)
+    levels += k * logRelease
+    out = np.exp(levels[1:])
+    return out, float(out[-1])
+
+
+# Chemin par défaut choisi par noyau d'après le benchmark du module (Numba vs NumPy) :
+# - SVF : lfilter plus rapide au-delà de ~16k échantillons (0.39 ms vs 0.45 ms sur 2 s),
+#   boucle compilée 3x plus rapide sur un bloc de 512 (3 µs vs 10 µs) ;
+# - lissage à un pôle et suiveur de crête : boucle compilée plus rapide à toute taille.
+SVF_LFILTER_MIN = 16384
+
+
+def svfBandpassDefault(x, f, q, low, band):
+    """SVF passe-bande : lfilter sur les buffers entiers, boucle compilée sur les blocs du callback"""
+    if len(x) >= SVF_LFILTER_MIN:
+        return svfBandpassNumpy(x, f, q, low, band)
+    return svfBandpassLoop(x, f, q, low, band)
+
+
+if USE_NUMBA:
+    svfBandpass, onePole, peakFollower = svfBandpassDefault, onePoleLoop, peakFollowerLoop
+else:
+    svfBandpass, onePole, peakFollower = svfBandpassNumpy, onePoleNumpy, peakFollowerNumpy
+
+
+class OnePoleSmoother:
+    """Lissage à un pôle d'une consigne (gain, fréquence) appliqué bloc par bloc
+
+    Utilisé par audioGen pour les gains des ports : une nouvelle intensité rejoint sa
+    consigne en quelques ms au lieu de sauter d'un bloc à l'autre.
+    """
+
+    def __init__(self, sampleRate, timeConstant=0.01, value=0.0):
+        self.coeff = onePoleCoeff(timeConstant, sampleRate)
+        self.state = float(value)
+        self.target = float(value)
+
+    def setTarget(self, value):
+        self.target = float(value)
+
+    def generate(self, frames):
+        """Valeurs lissées des `frames` prochains échantillons"""
+        if self.state == self.target:
+            return np.full(frames, self.state)
+        out, self.state = onePole(np.full(frames, self.target), self.coeff, self.state)
+        if abs(self.state - self.target) < 1e-9 * max(abs(self.target), 1.0):
+            self.state = self.target
+        return out
+
+
+class PeakFollower:
+    """Suiveur d'enveloppe de crête traité par blocs (attaque instantanée, relâchement exponentiel)"""
+
+    def __init__(self, sampleRate, releaseTime=0.05):
+        self.release = 1.0 - onePoleCoeff(releaseTime, sampleRate)
+        self.state = 0.0
+
+    def reset(self):
+        self.state = 0.0
+
+    def process(self, block):
+        """Enveloppe du bloc, l'état est conservé entre les appels"""
+        out, self.state = peakFollower(np.asarray(block, dtype=np.float64), self.release, self.state)
+        return out
+
+
+if __name__ == "__main__":
+    # Benchmark des deux chemins (Python pur ou Numba, et NumPy/SciPy) sur 2 s à 48 kHz
+    sampleRate = 48000
+    signal = np.random.normal(0, 1, sampleRate * 2)
+    omega = 2 * np.pi * 150.0 / sampleRate
+    f, q = 2 * np.sin(omega) / 2.0, 2.0
+    coeff = onePoleCoeff(0.01, sampleRate)
+    release = 1.0 - onePoleCoeff(0.05, sampleRate)
+
+    kernels = {
+        "SVF passe-bande": (svfBandpassLoop, svfBandpassNumpy, (f, q), (0.0, 0.0)),
+        "Lissage 1 pôle": (onePoleLoop, onePoleNumpy, (coeff,), (0.0,)),
+        "Suiveur de crête": (peakFollowerLoop, peakFollowerNumpy, (release,), (0.0,)),
+    }
+    defaults = {"SVF passe-bande": svfBandpass, "Lissage 1 pôle": onePole, "Suiveur de crête": peakFollower}
+    loopName = "Numba" if USE_NUMBA else "Python"
+
+    def timed(kernel, params, initial, blockSize=None, repeats=5):
+        # Meilleur temps sur le buffer entier, ou sur tout le signal par blocs (état transmis)
+        best, output = math.inf, None
+        for _ in range(repeats):
+            start = time.perf_counter()
+            if blockSize is None:
+                output, *_ = kernel(signal, *params, *initial)
+            else:
+                blocks, state = [], initial
+                for i in range(0, len(signal), blockSize):
+                    out, *state = kernel(signal[i:i + blockSize], *params, *state)
+                    blocks.append(out)
+                output = np.concatenate(blocks)
+            best = min(best, time.perf_counter() - start)
+        return best * 1e3, output
+
+    print(f"Numba {'disponible' if HAVE_NUMBA else 'absent'}, chemin par défaut : {'choisi par noyau' if USE_NUMBA else 'NumPy'}")
+    if USE_NUMBA:
+        for name, (loop, _, params, initial) in kernels.items():
+            start = time.perf_counter()
+            loop(signal[:16], *params, *initial)  # Compilation ou chargement depuis le cache disque
+            print(f"{name:<18} compilation/chargement {(time.perf_counter() - start) * 1e3:.0f} ms")
+
+    print(f"{'':<18} {'buffer entier (2 s), ms':>29}     {'blocs de 512, ms':>26}")
+    print(f"{'':<18} {loopName:>9} {'NumPy':>9} {'défaut':>9}     {loopName:>8} {'NumPy':>8} {'défaut':>8}     écart max")
+    for name, (loop, vectorized, params, initial) in kernels.items():
+        repeats = 5 if USE_NUMBA else 1  # Boucle Python pure : une seule mesure suffit
+        loopFull, reference = timed(loop, params, initial, repeats=repeats)
+        loopBlocks, _ = timed(loop, params, initial, 512, repeats)
+        vecFull, result = timed(vectorized, params, initial)
+        vecBlocks, streamed = timed(vectorized, params, initial, 512)
+        defaultFull, _ = timed(defaults[name], params, initial)
+        defaultBlocks, _ = timed(defaults[name], params, initial, 512)
+        error = max(np.max(np.abs(result - reference)), np.max(np.abs(streamed - reference)))
+
+        print(f"{name:<18} {loopFull:9.2f} {vecFull:9.2f} {defaultFull:9.2f}     "
+              f"{loopBlocks:8.2f} {vecBlocks:8.2f} {defaultBlocks:8.2f}     {error:.1e}")
@@ -0,0 +1,128 @@
+from functools import lru_cache
+
+import numpy as np
+
+# Enveloppes communes au serveur (SignalSynth) et à l'interface (audioGen)
+ENVELOPE_TYPES = ("Aucune", "Sinusoïdale", "Exponentielle", "Impulsion", "Créneau", "Logarithmique", "Fade In/Out")
+
+ATTACK_TIME = 0.01    # Impulsion : montée
+DECAY_TIME = 0.05     # Impulsion : descente
+FADE_IN_TIME = 0.1    # Fade In/Out
+FADE_OUT_TIME = 0.1
+MODULATION_FREQ = 2.0  # Sinusoïdale et Créneau (Hz)
+
+
+def _firstIndexAtLeast(time, fs, n):
+    """Plus petit indice i tel que i / fs >= time (borné à [0, n])"""
+    i = min(max(int(np.ceil(time * fs)), 0), n)
+    while i > 0 and (i - 1) / fs >= time:
+        i -= 1
+    while i < n and i / fs < time:
+        i += 1
+    return i
+
+
+def _readOnly(values):
+    values.setflags(write=False)
+    return values
+
+
+@lru_cache(maxsize=64)
+def envelopeSegments(modulationType, numSamples, fs):
+    """Régions non triviales de l'enveloppe : liste de (début, fin, valeurs)
+
+    Hors de ces régions l'enveloppe vaut 1. Les valeurs sont un tableau en lecture seule
+    ou un scalaire (0 après la fin d'une impulsion).
+    """
+    n = numSamples
+    if modulationType == "Aucune" or n == 0:
+        return ()
+
+    if modulationType == "Impulsion":
+        attackEnd = _firstIndexAtLeast(ATTACK_TIME, fs, n)
+        decayEnd = _firstIndexAtLeast(ATTACK_TIME + DECAY_TIME, fs, n)
+        attack = np.arange(attackEnd) / fs / ATTACK_TIME
+        decay = 1 - ((np.arange(attackEnd, decayEnd) / fs - ATTACK_TIME) / DECAY_TIME)
+        return ((0, attackEnd, _readOnly(attack)), (attackEnd, decayEnd, _readOnly(decay)), (decayEnd, n, 0.0))
+
+    if modulationType == "Fade In/Out":
+        tEnd = (n - 1) / fs
+        fadeInEnd = _firstIndexAtLeast(FADE_IN_TIME, fs, n)
+        # Premier indice strictement après tEnd - FADE_OUT_TIME
+        fadeOutStart = _firstIndexAtLeast(tEnd - FADE_OUT_TIME, fs, n)
+        while fadeOutStart < n and fadeOutStart / fs <= tEnd - FADE_OUT_TIME:
+            fadeOutStart += 1
+        # Le fade out l'emporte là où les deux régions se chevauchent
+        fadeInEnd = min(fadeInEnd, fadeOutStart)
+        fadeIn = np.arange(fadeInEnd) / fs / FADE_IN_TIME
+        fadeOut = (tEnd - np.arange(fadeOutStart, n) / fs) / FADE_OUT_TIME
+        return ((0, fadeInEnd, _readOnly(fadeIn)), (fadeOutStart, n, _readOnly(fadeOut)))
+
+    # Enveloppes denses : table complète
+    t = np.arange(n) / fs
+    if modulationType == "Sinusoïdale":
+        values = 0.5 * (1 - np.cos(2 * np.pi * MODULATION_FREQ * t))
+    elif modulationType == "Exponentielle":
+        values = np.exp(-2 * t)
+    elif modulationType == "Créneau":
+        values = 0.5 + 0.5 * np.sign(np.sin(2 * np.pi * MODULATION_FREQ * t))
+    elif modulationType == "Logarithmique":
+        values = np.log(1 + 5 * t)
+        values /= np.max(values) if n > 1 else 1.0
+    else:
+        raise ValueError(f"Type de modulation non supporté: {modulationType}")
+    return ((0, n, _readOnly(values)),)
+
+
+def applyEnvelope(waveform, modulationType, fs):
+    """Applique l'enveloppe en place (sur la dernière dimension) et renvoie waveform"""
+    for start, stop, values in envelopeSegments(modulationType, waveform.shape[-1], fs):
+        if np.isscalar(values) and values == 0:
+            waveform[..., start:stop] = 0
+        else:
+            waveform[..., start:stop] *= values
+    return waveform
+
+
+def applyEnvelopeBlock(block, modulationType, fs, numSamples, start):
+    """Applique en place la partie [start, start + len(block)) de l'enveloppe d'un signal de numSamples échantillons"""
+    stop = start + block.shape[-1]
+    for segStart, segStop, values in envelopeSegments(modulationType, numSamples, fs):
+        lo, hi = max(segStart, start), min(segStop, stop)
+        if lo >= hi:
+            continue
+        if np.isscalar(values) and values == 0:
+            block[..., lo - start:hi - start] = 0
+        else:
+            block[..., lo - start:hi - start] *= values[lo - segStart:hi - segStart]
+    return block
+
+
+def envelope(modulationType, numSamples, fs, dtype=np.float64):
+    """Enveloppe complète (pour l'affichage ou les appelants qui veulent le tableau)"""
+    return applyEnvelope(np.ones(numSamples, dtype=dtype), modulationType, fs)
+
+
+if __name__ == "__main__":
+    # Benchmark : masque complet recalculé à chaque rendu vs enveloppe creuse en cache
+    import time
+
+    fs = 48000
+    n = fs * 4
+    t = np.arange(n) / fs
+    waveform = np.random.normal(0, 1, n)
+    for modulationType in ENVELOPE_TYPES:
+        start = time.perf_counter()
+        for _ in range(50):
+            reference = waveform * envelope(modulationType, n, fs)
+            envelopeSegments.cache_clear()
+        denseTime = (time.perf_counter() - start) / 50
+
+        applyEnvelope(waveform.copy(), modulationType, fs)  # Remplit le cache
+        buffers = [waveform.copy() for _ in range(50)]
+        start = time.perf_counter()
+        for buffer in buffers:
+            applyEnvelope(buffer, modulationType, fs)
+        cachedTime = (time.perf_counter() - start) / 50
+        print(f"{modulationType:<14} sans cache {denseTime * 1e3:.3f} ms, en cache et en place {cachedTime * 1e3:.3f} ms, "
+              f"écart max {np.max(np.abs(buffers[0] - reference)):.1e}")
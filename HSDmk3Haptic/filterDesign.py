@@ -0,0 +1,66 @@
+import numpy as np
+from functools import lru_cache
+from scipy.signal import butter, sosfilt, sosfilt_zi
+
+
+@lru_cache(maxsize=64)
+def designFilter(btype, order, cutoff, fs):
+    """Calcule (une seule fois) un Butterworth en sections du second ordre"""
+    nyquist = 0.5 * fs
+    normal_cutoff = np.asarray(cutoff) / nyquist
+    # Tableau partagé par tous les appelants via le cache : ne pas le modifier
+    return butter(order, normal_cutoff, btype=btype, analog=False, output='sos')
+
+
+def _cutoffKey(cutoff):
+    # Les listes (passe-bande) ne sont pas hachables
+    if np.ndim(cutoff):
+        return tuple(float(c) for c in np.ravel(cutoff))
+    return float(cutoff)
+
+
+def getSos(cutoff, fs, order=5, btype='low'):
+    """Renvoie la conception mise en cache pour (type, ordre, coupure, fs)"""
+    return designFilter(btype, int(order), _cutoffKey(cutoff), float(fs))
+
+
+def filterSignal(data, cutoff, fs, order=5, btype='low', zi=None):
+    """Filtre un signal complet ; avec zi, renvoie aussi l'état final pour le bloc suivant
+
+    Un signal float32 est filtré en float32 (sections du second ordre converties).
+    """
+    sos = getSos(cutoff, fs, order, btype)
+    if getattr(data, 'dtype', None) == np.float32:
+        sos = sos.astype(np.float32)
+        if zi is not None:
+            zi = np.asarray(zi, dtype=np.float32)
+    if zi is None:
+        return sosfilt(sos, data)
+    return sosfilt(sos, data, zi=zi)
+
+
+def initialState(cutoff, fs, order=5, btype='low', steadyValue=None):
+    """État initial nul, ou en régime établi pour une entrée constante steadyValue"""
+    sos = getSos(cutoff, fs, order, btype)
+    if steadyValue is None:
+        return np.zeros((sos.shape[0], 2))
+    return sosfilt_zi(sos) * steadyValue
+
+
+def clearFilterCache():
+    designFilter.cache_clear()
+
+
+class ChunkFilter:
+    """Filtre Butterworth qui conserve son état d'un bloc à l'autre"""
+
+    def __init__(self, cutoff, fs, order=5, btype='low'):
+        self.sos = getSos(cutoff, fs, order, btype)
+        self.zi = np.zeros((self.sos.shape[0], 2))
+
+    def reset(self):
+        self.zi = np.zeros((self.sos.shape[0], 2))
+
+    def process(self, block):
+        y, self.zi = sosfilt(self.sos, block, zi=self.zi)
+        return y
@@ -0,0 +1,126 @@
+import time
+from functools import lru_cache
+
+import numpy as np
+
+from actuatorLayout import ActuatorLayout
+from trajectory import ACTUATORS, intensitiesFromPositions
+
+# 160 pas : les abscisses et ordonnées des actionneurs (0.1, 0.5, 0.9) tombent sur des nœuds,
+# l'échantillonnage bilinéaire est alors exact dans le rectangle des actionneurs
+DEFAULT_RESOLUTION = 161
+
+
+@lru_cache(maxsize=8)
+def buildIntensityGrid(actuators, resolution):
+    """Table (resolution, resolution, n) des intensités sur le plan normalisé [0, 1]²
+
+    table[i, j] contient les n intensités en (x, y) = (i, j) / (resolution - 1).
+    """
+    axis = np.linspace(0.0, 1.0, resolution)
+    xs, ys = np.meshgrid(axis, axis, indexing='ij')
+    positions = np.column_stack((xs.ravel(), ys.ravel()))
+    table = intensitiesFromPositions(positions, actuators).T.reshape(resolution, resolution, -1)
+    table = np.ascontiguousarray(table)
+    table.setflags(write=False)
+    return table
+
+
+@lru_cache(maxsize=8)
+def _gridRows(actuators, resolution):
+    # Même table en listes Python : une lecture isolée évite le coût fixe des petits tableaux NumPy
+    return buildIntensityGrid(actuators, resolution).tolist()
+
+
+class IntensityGrid:
+    """Intensités de l'actionneur fantôme lues dans une table précalculée (interpolation bilinéaire)
+
+    La table est reconstruite automatiquement si la disposition des actionneurs change.
+    Les positions hors du plan [0, 1]² sont ramenées au bord.
+    """
+
+    def __init__(self, actuators=ACTUATORS, resolution=DEFAULT_RESOLUTION):
+        self.resolution = resolution
+        self.actuators = actuators
+
+    @property
+    def actuators(self):
+        return self._actuators
+
+    @actuators.setter
+    def actuators(self, actuators):
+        if not isinstance(actuators, ActuatorLayout):
+            actuators = tuple(tuple(float(c) for c in point) for point in actuators)
+        self._actuators = actuators
+        self._build()
+
+    def setResolution(self, resolution):
+        self.resolution = resolution
+        self._build()
+
+    def _build(self):
+        self.table = buildIntensityGrid(self._actuators, self.resolution)
+        self.rows = _gridRows(self._actuators, self.resolution)
+
+    def sample(self, x, y):
+        """Intensités des n actionneurs en (x, y) : liste de n valeurs"""
+        scale = self.resolution - 1
+        fx = x * scale if 0.0 < x < 1.0 else (0.0 if x <= 0.0 else float(scale))
+        fy = y * scale if 0.0 < y < 1.0 else (0.0 if y <= 0.0 else float(scale))
+        i = int(fx) if fx < scale else scale - 1
+        j = int(fy) if fy < scale else scale - 1
+        fx -= i
+        fy -= j
+        gx = 1.0 - fx
+        rowI, rowNext = self.rows[i], self.rows[i + 1]
+        return [(a * gx + b * fx) * (1.0 - fy) + (c * gx + d * fx) * fy
+                for a, b, c, d in zip(rowI[j], rowNext[j], rowI[j + 1], rowNext[j + 1])]
+
+    def sampleMany(self, positions):
+        """Intensités (n, m) pour m positions (m, 2), en un seul appel"""
+        scale = self.resolution - 1
+        points = np.clip(np.asarray(positions, dtype=np.float64).reshape(-1, 2), 0.0, 1.0) * scale
+        cells = np.minimum(points.astype(np.intp), scale - 1)
+        frac = points - cells
+        i, j = cells[:, 0], cells[:, 1]
+        fx, fy = frac[:, :1], frac[:, 1:]
+        table = self.table
+        out = (table[i, j] * (1 - fx) + table[i + 1, j] * fx) * (1 - fy)
+        out += (table[i, j + 1] * (1 - fx) + table[i + 1, j + 1] * fx) * fy
+        return out.T
+
+
+if __name__ == "__main__":
+    # Précision et coût : calcul direct vs lecture de table
+    from patternManager import PatternManager
+
+    rng = np.random.default_rng(0)
+    inside = rng.uniform(0.1, 0.9, (100000, 2))
+    plane = rng.uniform(0.0, 1.0, (100000, 2))
+    manager = PatternManager()
+
+    for resolution in (41, 81, DEFAULT_RESOLUTION, 321):
+        start = time.perf_counter()
+        grid = IntensityGrid(resolution=resolution)
+        buildTime = time.perf_counter() - start
+        errInside = np.max(np.abs(grid.sampleMany(inside) - intensitiesFromPositions(inside)))
+        errPlane = np.max(np.abs(grid.sampleMany(plane) - intensitiesFromPositions(plane)))
+        print(f"Résolution {resolution:>3} : construction {buildTime * 1e3:6.2f} ms, "
+              f"écart max {errInside:.1e} (rectangle des actionneurs), {errPlane:.1e} (plan entier)")
+
+    grid = IntensityGrid()
+    points = plane[:10000].tolist()
+    start = time.perf_counter()
+    for x, y in points:
+        gamma, beta = (x - 0.1) / 0.8, (y - 0.1) / 0.8
+        [max(0, min(v, 1)) for v in manager.get_Intensities(1, x, gamma, beta)]
+    directTime = (time.perf_counter() - start) / len(points)
+    start = time.perf_counter()
+    for x, y in points:
+        grid.sample(x, y)
+    gridTime = (time.perf_counter() - start) / len(points)
+    start = time.perf_counter()
+    grid.sampleMany(plane)
+    batchTime = (time.perf_counter() - start) / len(plane)
+    print(f"Par position : direct {directTime * 1e6:.2f} µs, table {gridTime * 1e6:.2f} µs, "
+          f"lot de {len(plane)} {batchTime * 1e6:.3f} µs")
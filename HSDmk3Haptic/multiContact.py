@@ -0,0 +1,172 @@
+import math
+import time
+
+import numpy as np
+
+from intensityGrid import IntensityGrid
+from trajectory import ACTUATORS, BASE_PATTERN_STEPS, compileTrajectory, intensitiesFromPositions
+from trajectoryFile import compileTrajectoryFile, isTrajectoryFile
+
+# Règles de mélange des gains de plusieurs contacts simultanés
+MIX_RULES = ("energy", "max")
+# Tolérance sur l'indice de pas : i * (durée / pas) * (pas / durée) peut tomber juste sous i
+STEP_EPSILON = 1e-9
+
+
+class Contact:
+    """Un point de contact : source de position, poids et fenêtre d'activité [start, stop) en secondes
+
+    `positionAt(secondes)` est vectorisée (voir patternClock) ; elle reçoit le temps local,
+    compté depuis `start` : un tapotement démarre sa trajectoire à son propre début.
+    Un contact créé par fromPattern n'a pas de positionAt : il rejoue le log compilé du pattern.
+    """
+
+    def __init__(self, positionAt, weight=1.0, start=0.0, stop=math.inf):
+        self.positionAt = positionAt
+        self.weight = float(weight)
+        self.start = float(start)
+        self.stop = float(stop)
+        self.pattern = None
+
+    @classmethod
+    def fromPattern(cls, pattern, period, weight=1.0, start=0.0, stop=math.inf, numRoundTrips=1,
+                    numSteps=BASE_PATTERN_STEPS):
+        """Contact rejouant un pattern nommé ou un fichier de trajectoire, un cycle par `period` secondes
+
+        Le log est celui de compileTrajectory / compileTrajectoryFile (numSteps pas étalés sur
+        `period`) : un contact seul donne exactement le log du pattern joué seul.
+        """
+        contact = cls(None, weight, start, stop)
+        contact.pattern = pattern
+        contact.period = float(period)
+        contact.numRoundTrips = numRoundTrips
+        contact.numSteps = numSteps
+        return contact
+
+    def compiledLog(self, layout=ACTUATORS):
+        """Log d'intensités (n actionneurs, pas) du pattern de ce contact pour `layout`"""
+        if isTrajectoryFile(self.pattern):
+            return compileTrajectoryFile(self.pattern, self.numSteps, layout)[0]
+        return compileTrajectory(self.pattern, self.numSteps, self.numRoundTrips, layout)[0]
+
+
+def mixGains(gains, rule="energy", ceiling=1.0):
+    """Mélange des gains (contacts, actionneurs, m) en (actionneurs, m), puis limiteur par canal
+
+    energy : racine de la somme des carrés (puissance vibratoire conservée) ;
+    max : gain du contact le plus fort. `ceiling` : plafond scalaire ou un par actionneur.
+    """
+    if rule == "energy":
+        mixed = np.sqrt(np.einsum('knm,knm->nm', gains, gains))
+    elif rule == "max":
+        mixed = gains.max(axis=0)
+    else:
+        raise ValueError(f"Règle de mélange '{rule}' non reconnue ({', '.join(MIX_RULES)})")
+    ceiling = np.asarray(ceiling, dtype=np.float64)
+    np.minimum(mixed, ceiling[:, None] if ceiling.ndim else ceiling, out=mixed)
+    return mixed
+
+
+class ContactMixer:
+    """Superposition de plusieurs contacts : gains par actionneur en une passe vectorisée
+
+    Les logs des contacts de pattern sont compilés une fois et empilés dans une table
+    (contacts, pas, actionneurs) : les gains de tous ces contacts sont lus d'une seule
+    indexation, sans boucle Python par contact. Les contacts à positionAt libre sont
+    évalués un par un (positions puis intensités).
+    """
+
+    def __init__(self, contacts, layout=ACTUATORS, rule="energy", ceiling=1.0, grid=None, sampleRate=None):
+        if rule not in MIX_RULES:
+            raise ValueError(f"Règle de mélange '{rule}' non reconnue ({', '.join(MIX_RULES)})")
+        # Contacts de pattern d'abord, puis contacts libres (le mélange ne dépend pas de l'ordre)
+        self.compiled = [contact for contact in contacts if contact.pattern is not None]
+        self.free = [contact for contact in contacts if contact.pattern is None]
+        self.contacts = self.compiled + self.free
+        self.layout = layout
+        self.rule = rule
+        self.ceiling = ceiling
+        self.grid = grid if grid is not None else IntensityGrid(layout)
+        self.numActuators = len(layout)
+        self.sampleRate = sampleRate  # Nécessaire seulement pour generate
+        self.sampleCount = 0
+
+        self.weights = np.array([contact.weight for contact in self.contacts])
+        self.starts = np.array([contact.start for contact in self.contacts])
+        self.stops = np.array([contact.stop for contact in self.contacts])
+
+        logs = [contact.compiledLog(layout) for contact in self.compiled]
+        self.lengths = np.array([log.shape[1] for log in logs], dtype=np.intp)
+        self.stepRates = np.array([log.shape[1] / contact.period for log, contact in zip(logs, self.compiled)])
+        self.table = np.zeros((len(logs), max(self.lengths, default=1), self.numActuators))
+        for k, log in enumerate(logs):
+            self.table[k, :log.shape[1]] = log.T
+        self.rows = np.arange(len(logs))[:, None]
+
+    def _gains(self, seconds, exact):
+        # Gains pondérés (contacts, actionneurs, m) de tous les contacts aux instants `seconds`
+        gains = np.empty((len(self.contacts), self.numActuators, len(seconds)))
+        local = seconds[None, :] - self.starts[:, None]
+        if self.compiled:
+            k = len(self.compiled)
+            steps = np.floor(local[:k] * self.stepRates[:, None] + STEP_EPSILON).astype(np.intp)
+            steps %= self.lengths[:, None]
+            gains[:k] = self.table[self.rows, steps].transpose(0, 2, 1)
+        for k, contact in enumerate(self.free, len(self.compiled)):
+            positions = contact.positionAt(local[k])
+            gains[k] = intensitiesFromPositions(positions, self.layout) if exact else self.grid.sampleMany(positions)
+        active = (local >= 0) & (seconds[None, :] < self.stops[:, None])
+        gains *= (self.weights[:, None] * active)[:, None, :]
+        return gains
+
+    def gainsAt(self, seconds):
+        """Gains mélangés (actionneurs, m) aux instants `seconds` (calcul exact des intensités)"""
+        seconds = np.asarray(seconds, dtype=np.float64).reshape(-1)
+        return mixGains(self._gains(seconds, True), self.rule, self.ceiling)
+
+    def compile(self, numSteps, duration):
+        """Log d'intensités (actionneurs, numSteps) : un pas toutes les duration / numSteps secondes"""
+        return self.gainsAt(np.arange(numSteps) * (duration / numSteps))
+
+    def reset(self):
+        self.sampleCount = 0
+
+    def generate(self, frames):
+        """Gains (liste, un par actionneur) des `frames` prochains échantillons, comme PatternFrameGenerator"""
+        if self.sampleRate is None:
+            raise ValueError("ContactMixer.generate demande une fréquence d'échantillonnage (sampleRate)")
+        centre = np.array(((self.sampleCount + 0.5 * frames) / self.sampleRate,))
+        self.sampleCount += frames
+        return mixGains(self._gains(centre, False), self.rule, self.ceiling)[:, 0].tolist()
+
+
+if __name__ == "__main__":
+    from patternClock import positionSource
+    from trajectory import PATTERNS
+
+    # Un contact seul : même log que le pattern compilé seul
+    for pattern in PATTERNS:
+        reference, _ = compileTrajectory(pattern, BASE_PATTERN_STEPS, 3)
+        single = ContactMixer([Contact.fromPattern(pattern, 2.0, numRoundTrips=3)]).compile(reference.shape[1], 2.0)
+        print(f"1 contact {pattern:<13} vs compileTrajectory : écart max {np.max(np.abs(single - reference)):.1e}")
+
+    # Coût d'un log et d'un bloc audio selon le nombre de contacts
+    numSteps, duration = 2000, 2.0
+    patterns = [("DroiteGauche", duration, 1.0, 0.0, math.inf), ("Vertical", duration, 0.8, 0.0, math.inf),
+                ("Circulaire", 0.5, 0.6, 0.5, 1.5), ("Diagonal", 0.2, 1.0, 1.0, 1.2)]  # Dernier : tapotement bref
+    contacts = [Contact.fromPattern(*spec) for spec in patterns * 2]
+    free = [Contact(positionSource(*spec[:2]), *spec[2:]) for spec in patterns * 2]
+    for label, pool in (("pattern", contacts), ("libre", free)):
+        for k in (1, 2, 4, 8):
+            for rule in MIX_RULES:
+                mixer = ContactMixer(pool[:k], rule=rule, ceiling=[1.0, 1.0, 1.0, 1.0, 0.8, 0.8], sampleRate=48000)
+                start = time.perf_counter()
+                for _ in range(20):
+                    log = mixer.compile(numSteps, duration)
+                compileTime = (time.perf_counter() - start) / 20
+                start = time.perf_counter()
+                for _ in range(200):
+                    mixer.generate(512)
+                blockTime = (time.perf_counter() - start) / 200
+                print(f"{k} contact(s) {label:<7}, {rule:<6} : log de {numSteps} pas {compileTime * 1e3:.3f} ms, "
+                      f"bloc de 512 {blockTime * 1e6:.1f} µs, gain max {log.max():.2f}")
@@ -0,0 +1,125 @@
+import time
+from collections import OrderedDict
+
+import numpy as np
+from filterDesign import filterSignal
+
+
+class NoiseBank:
+    """Banque de tables de bruit gaussien filtré passe-bas, une par fréquence de coupure
+
+    Chaque table est circulaire (filtrée en régime périodique) : une lecture à un décalage
+    aléatoire, avec bouclage, reste continue. Les tables sont calculées une seule fois ;
+    un déclenchement ne coûte plus qu'une copie.
+    """
+
+    def __init__(self, sampleRate, tableSeconds=4.0, seed=0, order=5, maxTables=16,
+                 crossfadeSeconds=0.01, dtype=np.float64):
+        self.sampleRate = sampleRate
+        self.tableLength = int(sampleRate * tableSeconds)
+        self.seed = seed
+        self.order = order
+        self.maxTables = maxTables
+        self.crossfade = int(sampleRate * crossfadeSeconds)
+        self.dtype = np.dtype(dtype)
+        self.tables = OrderedDict()
+        self.rng = np.random.default_rng()  # Décalages des déclenchements sans graine
+
+    def getTable(self, cutoff):
+        """Table de bruit blanc unitaire filtré à `cutoff` (calculée au premier appel)"""
+        key = float(cutoff)
+        table = self.tables.get(key)
+        if table is not None:
+            self.tables.move_to_end(key)
+            return table
+
+        # Graine propre à chaque coupure : tables reproductibles et indépendantes
+        rng = np.random.default_rng((self.seed, int(key * 1000)))
+        white = rng.standard_normal(self.tableLength)
+
+        # Deux passages sur le signal répété : la seconde moitié est en régime périodique
+        table = filterSignal(np.concatenate((white, white)), cutoff, self.sampleRate, self.order)[self.tableLength:]
+        table = table.astype(self.dtype)
+        table.setflags(write=False)
+
+        self.tables[key] = table
+        if len(self.tables) > self.maxTables:
+            self.tables.popitem(last=False)
+        return table
+
+    def _read(self, table, offset, n):
+        # Lecture circulaire à partir de offset (n <= len(table))
+        end = offset + n
+        if end <= len(table):
+            return table[offset:end].copy()
+        return np.concatenate((table[offset:], table[:end - len(table)]))
+
+    def segment(self, cutoff, n, seed=None):
+        """Renvoie n échantillons de bruit blanc unitaire filtré à `cutoff`
+
+        Avec une graine, le résultat est reproductible. Au-delà de la longueur d'une table,
+        des segments pris à des décalages différents sont enchaînés en fondu à puissance constante.
+        """
+        table = self.getTable(cutoff)
+        rng = np.random.default_rng(seed) if seed is not None else self.rng
+
+        if n <= len(table):
+            return self._read(table, int(rng.integers(len(table))), n)
+
+        xfade = min(self.crossfade, len(table) // 4)
+        step = len(table) - xfade
+        output = np.empty(n, dtype=self.dtype)
+        # Fondu cos/sin : la variance d'un mélange de bruits indépendants est conservée
+        fadeIn = np.sin(0.5 * np.pi * (np.arange(xfade) + 0.5) / xfade).astype(self.dtype)
+        fadeOut = np.cos(0.5 * np.pi * (np.arange(xfade) + 0.5) / xfade).astype(self.dtype)
+
+        pos = 0
+        while pos < n:
+            part = self._read(table, int(rng.integers(len(table))), min(len(table), n - pos))
+            if pos == 0:
+                output[:len(part)] = part
+            else:
+                overlap = min(xfade, len(part))
+                output[pos:pos + overlap] = output[pos:pos + overlap] * fadeOut[:overlap] + part[:overlap] * fadeIn[:overlap]
+                output[pos + overlap:pos + len(part)] = part[overlap:]
+            pos += step
+        return output
+
+
+def referenceNoise(n, cutoff, sampleRate, std=10.0):
+    """Bruit tel qu'il était calculé à chaque déclenchement (gaussien puis Butterworth d'ordre 5)"""
+    return filterSignal(np.random.normal(0, std, n), cutoff, sampleRate)
+
+
+if __name__ == "__main__":
+    # Benchmark et comparaison statistique avec le calcul à chaque déclenchement
+    sampleRate = 48000
+    n = int(sampleRate * 2.0)
+    bank = NoiseBank(sampleRate)
+
+    for cutoff in (250.0, 500.0, 1000.0):
+        start = time.perf_counter()
+        reference = referenceNoise(n, cutoff, sampleRate)
+        refTime = time.perf_counter() - start
+
+        bank.getTable(cutoff)
+        start = time.perf_counter()
+        for _ in range(100):
+            served = 10.0 * bank.segment(cutoff, n)
+        bankTime = (time.perf_counter() - start) / 100
+
+        # Écart type en régime établi et densité spectrale moyenne dans la bande
+        refStd = np.std(reference[sampleRate // 10:])
+        freqs = np.fft.rfftfreq(n, 1 / sampleRate)
+        band = freqs < cutoff
+        refPsd = np.mean(np.abs(np.fft.rfft(reference))[band] ** 2)
+        bankPsd = np.mean(np.abs(np.fft.rfft(served))[band] ** 2)
+        print(f"Coupure {cutoff:.0f} Hz : {refTime * 1e3:.2f} ms -> {bankTime * 1e3:.3f} ms "
+              f"(x{refTime / bankTime:.0f}), écart type {refStd:.3f} / {np.std(served):.3f}, "
+              f"DSP dans la bande x{bankPsd / refPsd:.2f}")
+
+    a = bank.segment(500.0, 1000, seed=3)
+    b = bank.segment(500.0, 1000, seed=3)
+    print(f"Reproductible avec graine : {np.array_equal(a, b)}")
+    long = bank.segment(500.0, sampleRate * 10)
+    print(f"Segment de 10 s : écart type {np.std(long):.3f} (table : {np.std(bank.getTable(500.0)):.3f})")
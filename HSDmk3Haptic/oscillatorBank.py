@@ -0,0 +1,113 @@
+import numpy as np
+from filterDesign import ChunkFilter
+
+# Types de signaux synthétisables bloc par bloc
+OSCILLATOR_TYPES = ("Sinusoïdal", "Sinusoïdale", "Triangulaire", "Dente de Scie", "Bruit Blanc", "Mixte")
+
+
+class Oscillator:
+    """Oscillateur à phase continue qui produit exactement `frames` échantillons par appel
+
+    Les changements de fréquence et d'amplitude sont interpolés linéairement sur le bloc
+    suivant : pas de saut de phase ni de discontinuité d'amplitude entre deux blocs.
+    """
+
+    def __init__(self, sampleRate, waveType="Sinusoïdal", freq=100.0, amp=0.1,
+                 noiseStd=10.0, noiseCutoff=500.0, seed=None, dtype=np.float32):
+        if waveType not in OSCILLATOR_TYPES:
+            raise ValueError(f"Type de signal non supporté: {waveType}")
+        self.sampleRate = sampleRate
+        self.waveType = waveType
+        self.dtype = np.dtype(dtype)
+
+        self.freq = self.targetFreq = float(freq)
+        self.amp = self.targetAmp = float(amp)
+        self.phase = 0.0  # En cycles, dans [0, 1)
+
+        # Bruit filtré : le filtre garde son état entre les blocs
+        self.noiseStd = noiseStd
+        self.rng = np.random.default_rng(seed)
+        if waveType == "Bruit Blanc":
+            self.noiseFilter = ChunkFilter(freq, sampleRate)
+        elif waveType == "Mixte":
+            self.noiseFilter = ChunkFilter(noiseCutoff, sampleRate)
+        else:
+            self.noiseFilter = None
+
+    def setFrequency(self, freq):
+        self.targetFreq = float(freq)
+
+    def setAmplitude(self, amp):
+        self.targetAmp = float(amp)
+
+    def _phases(self, frames):
+        # Incrément de phase par échantillon, interpolé si la fréquence change
+        startInc = self.freq / self.sampleRate
+        endInc = self.targetFreq / self.sampleRate
+        if startInc == endInc:
+            phases = self.phase + startInc * np.arange(frames)
+            self.phase = (self.phase + startInc * frames) % 1.0
+        else:
+            increments = np.linspace(startInc, endInc, frames, endpoint=False)
+            phases = self.phase + np.concatenate(([0.0], np.cumsum(increments[:-1])))
+            self.phase = (self.phase + increments.sum()) % 1.0
+        self.freq = self.targetFreq
+        return phases
+
+    def _amplitudes(self, frames):
+        if self.amp == self.targetAmp:
+            return self.amp
+        amps = np.linspace(self.amp, self.targetAmp, frames, endpoint=False)
+        self.amp = self.targetAmp
+        return amps
+
+    def _noise(self, frames):
+        noise = self.rng.normal(0, self.noiseStd, frames)
+        return self.noiseFilter.process(noise)
+
+    def generate(self, frames):
+        """Produit le bloc suivant de `frames` échantillons"""
+        if self.waveType == "Bruit Blanc":
+            # La coupure suit la fréquence demandée (conception mise en cache)
+            if self.targetFreq != self.freq:
+                zi = self.noiseFilter.zi
+                self.noiseFilter = ChunkFilter(self.targetFreq, self.sampleRate)
+                self.noiseFilter.zi = zi
+                self.freq = self.targetFreq
+            block = self._noise(frames)
+        else:
+            phases = self._phases(frames)
+            if self.waveType in ("Sinusoïdal", "Sinusoïdale"):
+                block = np.sin(2 * np.pi * phases)
+            elif self.waveType == "Triangulaire":
+                block = 2 * np.abs(2 * (phases - np.floor(phases + 0.5))) - 1
+            elif self.waveType == "Dente de Scie":
+                block = 2 * (phases - np.floor(phases + 0.5))
+            else:  # Mixte
+                block = np.sin(2 * np.pi * phases) + self._noise(frames)
+
+        block *= self._amplitudes(frames)
+        return block.astype(self.dtype, copy=False)
+
+
+class OscillatorBank:
+    """Somme de plusieurs oscillateurs, générée bloc par bloc"""
+
+    def __init__(self, sampleRate, dtype=np.float32):
+        self.sampleRate = sampleRate
+        self.dtype = np.dtype(dtype)
+        self.oscillators = []
+
+    def add(self, waveType, freq, amp, **kwargs):
+        oscillator = Oscillator(self.sampleRate, waveType, freq, amp, dtype=self.dtype, **kwargs)
+        self.oscillators.append(oscillator)
+        return oscillator
+
+    def remove(self, oscillator):
+        self.oscillators.remove(oscillator)
+
+    def generate(self, frames):
+        output = np.zeros(frames, dtype=self.dtype)
+        for oscillator in self.oscillators:
+            output += oscillator.generate(frames)
+        return output
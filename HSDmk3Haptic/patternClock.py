@@ -0,0 +1,106 @@
+import time
+
+import numpy as np
+
+from intensityGrid import IntensityGrid
+from trajectory import patternPositionAt
+from trajectoryFile import isTrajectoryFile, loadTrajectory
+
+
+def patternPositions(pattern, period, numRoundTrips=1):
+    """Position continue d'un pattern joué en boucle, un cycle toutes les `period` secondes"""
+    def positionAt(seconds):
+        return patternPositionAt(pattern, np.asarray(seconds, dtype=np.float64) / period, numRoundTrips)
+    return positionAt
+
+
+def trajectoryPositions(trajectory, period=None):
+    """Position continue d'une Trajectory (images clés) jouée en boucle
+
+    `period` étire les images clés sur ce nombre de secondes, comme le log compilé
+    s'étend sur la durée du signal ; par défaut, la durée propre de la trajectoire.
+    """
+    scale = 1.0 if period is None else trajectory.duration / period
+    period = trajectory.duration if period is None else period
+
+    def positionAt(seconds):
+        phase = np.mod(np.asarray(seconds, dtype=np.float64), period)
+        return trajectory.evaluate(trajectory.times[0] + phase * scale)
+    return positionAt
+
+
+def positionSource(pattern, period, numRoundTrips=1):
+    """Position continue d'un pattern nommé ou d'un fichier de trajectoire, un cycle par `period` secondes"""
+    if isTrajectoryFile(pattern):
+        return trajectoryPositions(loadTrajectory(pattern), period)
+    return patternPositions(pattern, period, numRoundTrips)
+
+
+class PatternFrameGenerator:
+    """Gains spatiaux des actionneurs bloc par bloc, cadencés par l'horloge audio
+
+    Le temps est le nombre d'échantillons déjà produits (pas de sleep ni d'horloge murale) :
+    le callback audio demande les gains du bloc suivant, évalués au milieu du bloc.
+    `positionAt(secondes)` est vectorisée et renvoie des positions (m, 2) du plan normalisé.
+    """
+
+    def __init__(self, positionAt, sampleRate, grid=None):
+        self.positionAt = positionAt
+        self.sampleRate = sampleRate
+        self.grid = grid if grid is not None else IntensityGrid()
+        self.reset()
+
+    def reset(self):
+        self.sampleCount = 0
+        x, y = self.positionAt(np.zeros(1))[0]
+        self.position = (float(x), float(y))
+        self.gains = self.grid.sample(*self.position)
+
+    def generate(self, frames):
+        """Gains (liste, un par actionneur) des `frames` prochains échantillons"""
+        centre = (self.sampleCount + 0.5 * frames) / self.sampleRate
+        x, y = self.positionAt(np.array((centre,)))[0]
+        self.position = (float(x), float(y))
+        self.gains = self.grid.sample(*self.position)
+        self.sampleCount += frames
+        return self.gains
+
+    def gainsBetween(self, startSample, numFrames, frames):
+        """Gains (n actionneurs, numFrames) de numFrames blocs consécutifs, sans avancer l'horloge"""
+        centres = (startSample + frames * (np.arange(numFrames) + 0.5)) / self.sampleRate
+        return self.grid.sampleMany(self.positionAt(centres))
+
+
+if __name__ == "__main__":
+    # Gains pilotés par le nombre d'échantillons vs thread cadencé par time.sleep
+    import threading
+
+    sampleRate, frames, period = 48000, 512, 2.0
+    blockTime = frames / sampleRate
+    generator = PatternFrameGenerator(patternPositions("Circulaire", period), sampleRate)
+
+    start = time.perf_counter()
+    for _ in range(1000):
+        generator.generate(frames)
+    perBlock = (time.perf_counter() - start) / 1000
+    print(f"generate({frames}) : {perBlock * 1e6:.1f} µs par bloc ({blockTime * 1e3:.1f} ms de budget)")
+
+    # Bloc par bloc ou d'un coup : mêmes gains, l'horloge ne dérive pas
+    generator.reset()
+    streamed = np.array([generator.generate(frames) for _ in range(200)]).T
+    batch = generator.gainsBetween(0, 200, frames)
+    print(f"Écart bloc par bloc / en lot : {np.max(np.abs(streamed - batch)):.1e}")
+
+    # Gigue de l'ancienne boucle : pas de sleep(0.02) mesurés sur 1 s
+    stamps = []
+
+    def sleeper():
+        for _ in range(50):
+            stamps.append(time.perf_counter())
+            time.sleep(0.02)
+    thread = threading.Thread(target=sleeper)
+    thread.start()
+    thread.join()
+    steps = np.diff(stamps)
+    print(f"Thread time.sleep(0.02) : pas moyen {steps.mean() * 1e3:.2f} ms, gigue max {np.max(np.abs(steps - 0.02)) * 1e3:.2f} ms, "
+          f"dérive sur {len(steps)} pas {(stamps[-1] - stamps[0] - 0.02 * len(steps)) * 1e3:.1f} ms")
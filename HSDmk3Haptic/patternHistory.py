@@ -0,0 +1,107 @@
+import time
+
+import numpy as np
+
+DEFAULT_CAPACITY = 4096  # Pas conservés (≈ 20 patterns de 200 pas)
+
+
+class PatternHistory:
+    """Historique borné des positions et intensités par port, en tampon circulaire NumPy
+
+    Mémoire fixe allouée à la création ; chaque ajout est O(1) et écrase le pas le plus
+    ancien une fois le tampon plein. Les instantanés sont des copies en ordre chronologique.
+    """
+
+    def __init__(self, numPorts, capacity=DEFAULT_CAPACITY):
+        self.capacity = capacity
+        self.numPorts = numPorts
+        self.times = np.zeros(capacity)
+        self.positions = np.zeros((capacity, 2))
+        self.intensities = np.zeros((capacity, numPorts))
+        self.count = 0   # Pas valides (≤ capacity)
+        self.head = 0    # Prochain emplacement écrit
+        self.total = 0   # Pas ajoutés depuis la création ou le dernier clear
+
+    def __len__(self):
+        return self.count
+
+    def clear(self):
+        self.count = 0
+        self.head = 0
+        self.total = 0
+
+    def append(self, x, y, intensities, timestamp=None):
+        """Ajoute un pas (position et intensités des ports), horodaté par défaut à l'instant présent"""
+        i = self.head
+        self.times[i] = time.perf_counter() if timestamp is None else timestamp
+        self.positions[i, 0] = x
+        self.positions[i, 1] = y
+        self.intensities[i] = intensities
+        self.head = (i + 1) % self.capacity
+        self.count = min(self.count + 1, self.capacity)
+        self.total += 1
+
+    def extend(self, timestamps, positions, intensities):
+        """Ajoute m pas d'un coup : timestamps (m,), positions (m, 2), intensités (m, ports)"""
+        timestamps = np.asarray(timestamps, dtype=np.float64)
+        m = len(timestamps)
+        self.total += m
+        if m >= self.capacity:
+            # Seuls les derniers pas tiennent dans le tampon
+            keep = slice(m - self.capacity, m)
+            self.times[:], self.positions[:], self.intensities[:] = timestamps[keep], positions[keep], intensities[keep]
+            self.head, self.count = 0, self.capacity
+            return
+        first = min(m, self.capacity - self.head)
+        for dest, src in ((self.times, timestamps), (self.positions, positions), (self.intensities, intensities)):
+            dest[self.head:self.head + first] = src[:first]
+            dest[:m - first] = src[first:]
+        self.head = (self.head + m) % self.capacity
+        self.count = min(self.count + m, self.capacity)
+
+    def latest(self):
+        """Dernier pas : (horodatage, (x, y), intensités) ou None si l'historique est vide"""
+        if self.count == 0:
+            return None
+        i = self.head - 1
+        return float(self.times[i]), (float(self.positions[i, 0]), float(self.positions[i, 1])), self.intensities[i].copy()
+
+    def _order(self, last):
+        n = self.count if last is None else min(last, self.count)
+        return (np.arange(self.head - n, self.head)) % self.capacity
+
+    def snapshot(self, last=None):
+        """Copie chronologique des `last` derniers pas (tous par défaut) : (horodatages, positions, intensités)"""
+        order = self._order(last)
+        return self.times[order], self.positions[order], self.intensities[order]
+
+    def positionsSnapshot(self, last=None):
+        """Positions (m, 2) des derniers pas, pour l'affichage"""
+        return self.positions[self._order(last)]
+
+
+if __name__ == "__main__":
+    # Coût d'un ajout : liste de tuples qui grandit vs tampon circulaire à mémoire fixe
+    steps = 200000
+    intensities = [0.5] * 6
+
+    history = []
+    start = time.perf_counter()
+    for i in range(steps):
+        history.append((0.5, 0.5))
+    listTime = (time.perf_counter() - start) / steps
+
+    ring = PatternHistory(6)
+    start = time.perf_counter()
+    for i in range(steps):
+        ring.append(0.5, 0.5, intensities, i)
+    ringTime = (time.perf_counter() - start) / steps
+
+    start = time.perf_counter()
+    ring.extend(np.arange(steps), np.full((steps, 2), 0.5), np.full((steps, 6), 0.5))
+    extendTime = (time.perf_counter() - start) / steps
+
+    ringBytes = ring.times.nbytes + ring.positions.nbytes + ring.intensities.nbytes
+    print(f"Liste : {listTime * 1e6:.3f} µs par pas, {len(history)} éléments conservés")
+    print(f"Tampon circulaire : {ringTime * 1e6:.3f} µs par pas, extend {extendTime * 1e6:.4f} µs par pas, "
+          f"{len(ring)} pas conservés, {ringBytes / 1024:.0f} Kio fixes")
@@ -3,21 +3,40 @@ import time
 import numpy as np
 import math
 import matplotlib.pyplot as plt
+from trajectory import compileTrajectory, compile_pattern, patternSteps, ACTUATORS, HORIZON_ROUND_TRIPS
+from intensityGrid import IntensityGrid
+from actuatorLayout import ActuatorLayout
+from trajectoryFile import compileTrajectoryFile, isTrajectoryFile
+from patternClock import PatternFrameGenerator, positionSource
+from multiContact import ContactMixer
+from patternHistory import PatternHistory
 
 class PatternManager:
     def __init__(self):
         # Gestion des patterns
         self.patternRunning = False
         self.patternCurrent = None
-        self.patternPosition = []
         self.patternSpeed= 1.0
         self.patternDuration = 2.0
         self.nPattern = 200
         self.numRoundTrips = 1  # Nombre d'aller-retours pour le pattern horizontal
 
         # Intensités des ports
-        self.portIntensities = {port: 1.0 for port in range(6)}  
-        self.logIntensity = np.ones((6, self.nPattern))  
+        self.actuators = ACTUATORS
+        self.portIntensities = {port: 1.0 for port in range(len(self.actuators))}  
+        self.logIntensity = np.ones((len(self.actuators), self.nPattern))  
+        self.intensityGrid = IntensityGrid(self.actuators)
+
+        # Historique borné des positions et intensités (mémoire fixe, horodaté)
+        self.history = PatternHistory(len(self.actuators))
+
+    def setLayout(self, layout):
+        """Change la disposition des actionneurs (ACTUATORS ou ActuatorLayout) : une intensité par actionneur"""
+        self.actuators = layout
+        self.intensityGrid.actuators = layout
+        self.portIntensities = {port: 1.0 for port in range(len(layout))}
+        self.history = PatternHistory(len(layout), self.history.capacity)
+        self.logIntensity = np.ones((len(layout), self.nPattern))
 
     def configurePatternFromPreset(self, preset):
         self.patternCurrent = preset.pattern
@@ -25,13 +44,25 @@ class PatternManager:
         self.patternDuration = preset.duration
         self.numRoundTrips = preset.numRoundTrip if hasattr(preset, 'numRoundTrip') else 1
         print(self.numRoundTrips)
-        self.adjustPatternSpeed(self.patternSpeed)
-        self.startPattern()
+        self.nPattern = patternSteps(self.patternSpeed)
+
+        if isTrajectoryFile(self.patternCurrent):
+            # Fichier de trajectoire : compilé une fois, en cache à côté du fichier
+            logIntensity, positions = compileTrajectoryFile(self.patternCurrent, self.nPattern, self.actuators)
+            self.patternDuration /= self.patternSpeed
+        else:
+            # Log compilé une fois par session pour ces paramètres, puis réutilisé
+            logIntensity, positions, self.patternDuration = compile_pattern(
+                self.patternCurrent, self.patternSpeed, self.patternDuration, self.numRoundTrips, self.actuators)
+        # Copie modifiable : le log mémoïsé est partagé et en lecture seule (logIntensities écrit dedans)
+        self.logIntensity = np.array(logIntensity)
+        self.recordPositions(positions)
 
     def adjustPatternSpeed(self, patternSpeed):
+        # Le nombre de pas repart toujours de la vitesse 1 : pas de cumul d'un preset à l'autre
         self.patternDuration /= patternSpeed
-        self.nPattern = int(self.nPattern * patternSpeed)
-        self.logIntensity = np.ones((6, self.nPattern)) 
+        self.nPattern = patternSteps(patternSpeed)
+        self.logIntensity = np.ones((len(self.actuators), self.nPattern)) 
 
 
     def startPattern(self):
@@ -46,6 +77,12 @@ class PatternManager:
             "Vertical": self.verticalPattern
         }
 
+        if isTrajectoryFile(self.patternCurrent):
+            self.patternRunning = True
+            self.runTrajectoryFile(self.patternCurrent)
+            self.patternRunning = False
+            return
+
         if self.patternCurrent not in patterns:
             raise ValueError(f"Pattern '{self.patternCurrent}' non reconnu")
 
@@ -53,139 +90,76 @@ class PatternManager:
         patterns[self.patternCurrent]()
         self.patternRunning = False
 
+    def runTrajectory(self, pattern):
+        """Compile le pattern en une passe vectorisée : log d'intensités et positions parcourues"""
+        self.logIntensity, positions = compileTrajectory(pattern, self.nPattern, self.numRoundTrips, self.actuators)
+        self.recordPositions(positions)
+        if len(positions):
+            for port in range(len(self.actuators)):
+                self.portIntensities[port] = float(self.logIntensity[port, len(positions) - 1])
+
+    def runTrajectoryFile(self, path):
+        """Log d'intensités et positions d'un fichier de trajectoire (images clés)"""
+        logIntensity, positions = compileTrajectoryFile(path, self.nPattern, self.actuators)
+        self.logIntensity = np.array(logIntensity)
+        self.recordPositions(positions)
+        for port in range(len(self.actuators)):
+            self.portIntensities[port] = float(self.logIntensity[port, -1])
+
+    def frameGenerator(self, sampleRate, period=None):
+        """Gains temps réel du pattern courant, bloc par bloc (un cycle par `period`, sans fin)
+
+        Aucun log précalculé : le callback audio appelle generate(frames). None sans pattern.
+        `period` vaut par défaut la durée jouée du pattern (patternDuration).
+        """
+        if self.patternCurrent is None:
+            return None
+        period = self.patternDuration if period is None else period
+        positionAt = positionSource(self.patternCurrent, period, self.numRoundTrips)
+        return PatternFrameGenerator(positionAt, sampleRate, self.intensityGrid)
+
+    def configureContacts(self, contacts, rule="energy", ceiling=1.0, sampleRate=None):
+        """Plusieurs contacts simultanés (liste de Contact) mélangés en un seul log d'intensités
+
+        Le log couvre la durée jouée du pattern (patternDuration) sur nPattern pas.
+        Renvoie le ContactMixer, utilisable aussi en temps réel (generate) si sampleRate est donné.
+        """
+        mixer = ContactMixer(contacts, self.actuators, rule, ceiling, self.intensityGrid, sampleRate)
+        self.logIntensity = mixer.compile(self.nPattern, self.patternDuration)
+        for port in range(len(self.actuators)):
+            self.portIntensities[port] = float(self.logIntensity[port, -1])
+        return mixer
+
+    def recordPositions(self, positions):
+        """Ajoute à l'historique les pas parcourus, horodatés sur la durée jouée du pattern"""
+        if len(positions) == 0:
+            return
+        stepTime = self.patternDuration / self.logIntensity.shape[1]
+        timestamps = time.perf_counter() + stepTime * np.arange(len(positions))
+        self.history.extend(timestamps, positions, self.logIntensity[:, :len(positions)].T)
+
     def circularPattern(self):
-        center_x, center_y = 0.5, 0.5
-        radius = 0.3
-        angle = 0
-
-        for i in range(self.nPattern):
-            if not self.patternRunning:
-                break
-            angle += 2 * math.pi / self.nPattern
-            x = center_x + radius * math.cos(angle)
-            y = center_y + radius * math.sin(angle)
-            self.updateIntensitiesFromPosition(x, y)
-            self.patternPosition.append((x, y))
-            self.logIntensities(i)
+        self.runTrajectory("Circulaire")
 
     def RLPattern(self):
-        min_x, max_x = 0.1, 0.9
-        y = 0.5
-
-        points_per_trip = self.nPattern // self.numRoundTrips
-        total_steps = points_per_trip * self.numRoundTrips
-        self.logIntensity = np.ones((6, total_steps))  # Redimensionner correctement le log
-
-        for trip in range(self.numRoundTrips):
-            x_vals = np.linspace(max_x, min_x, points_per_trip)
-            for i in range(points_per_trip):
-                if not self.patternRunning:
-                    break
-                x = x_vals[i]
-                self.updateIntensitiesFromPosition(x, y)
-                self.patternPosition.append((x, y))
-                step = trip * points_per_trip + i
-                self.logIntensities(step)
-
+        self.runTrajectory("DroiteGauche")
 
     def diagonalPattern(self):
-        points = [(0.1, 0.1), (0.9, 0.9), (0.1, 0.9), (0.9, 0.1)]
-        current_point = 0
-
-        for i in range(self.nPattern):
-            if not self.patternRunning:
-                break
-            start_point = points[current_point]
-            next_point = points[(current_point + 1) % len(points)]
-
-            progress = i / self.nPattern
-            x = start_point[0] + (next_point[0] - start_point[0]) * progress
-            y = start_point[1] + (next_point[1] - start_point[1]) * progress
-
-            self.updateIntensitiesFromPosition(x, y)
-            self.patternPosition.append((x, y))
-            self.logIntensities(i)
-
-            if i == self.nPattern - 1:
-                current_point = (current_point + 1) % len(points)
+        self.runTrajectory("Diagonal")
 
     def horizonPattern(self):
-        min_x, max_x = 0.1, 0.9
-        y = 0.5
-        self.numRoundTrips  = 12  # Nombre d'aller-retours
-
-        # Calcul du nombre total de points pour chaque aller-retour
-        points_per_trip = self.nPattern // (2 * self.numRoundTrips )
-
-        for trip in range(self.numRoundTrips ):
-            # Aller
-            for i in range(points_per_trip):
-                if not self.patternRunning:
-                    break
-                x = np.linspace(min_x, max_x, points_per_trip)[i]
-                self.updateIntensitiesFromPosition(x, y)
-                self.patternPosition.append((x, y))
-                self.logIntensities(trip * 2 * points_per_trip + i)
-
-            # Retour
-            for i in range(points_per_trip):
-                if not self.patternRunning:
-                    break
-                x = np.linspace(max_x, min_x, points_per_trip)[i]
-                self.updateIntensitiesFromPosition(x, y)
-                self.patternPosition.append((x, y))
-                self.logIntensities(trip * 2 * points_per_trip + points_per_trip + i)
+        self.numRoundTrips = HORIZON_ROUND_TRIPS  # Nombre d'aller-retours
+        self.runTrajectory("Horizontal")
 
     def verticalPattern(self):
-        min_y, max_y = 0.1, 0.9
-        x = 0.5
-
-        for i in range(self.nPattern//2):
-            if not self.patternRunning:
-                break
-            y = np.linspace(min_y, max_y, self.nPattern//2)[i]
-            self.updateIntensitiesFromPosition(x, y)
-            self.patternPosition.append((x, y))
-            self.logIntensities(i)
-
-        for i in range(self.nPattern//2):
-            if not self.patternRunning:
-                break
-            y = np.linspace(max_y, min_y, self.nPattern//2)[i]
-            self.updateIntensitiesFromPosition(x, y)
-            self.patternPosition.append((x, y))
-            self.logIntensities(i+self.nPattern//2) 
+        self.runTrajectory("Vertical")
 
     def updateIntensitiesFromPosition(self, x, y):
-        # Points des actioneurs
-        xc1, yc1 = 0.1, 0.1
-        xc2, yc2 = 0.9, 0.1
-        xc3, yc3 = 0.1, 0.9
-        xc4, yc4 = 0.9, 0.9
-        xc5, yc5 = 0.5, 0.1
-        xc6, yc6 = 0.5, 0.9
-
-        gamma = (x - xc1) / (xc2 - xc1)
-        beta = (y - yc1) / (yc4 - yc1)
-
-        # Interpoaltion des intensités
-        Iv = 1  # Intensité Actionneur Fantôme
-        I1, I2, I3, I4, I5, I6 = self.get_Intensities(Iv, x, gamma, beta)
-
-        # Valeur entre 0 et 1
-        I1 = max(0, min(I1, 1))
-        I2 = max(0, min(I2, 1))
-        I3 = max(0, min(I3, 1))
-        I4 = max(0, min(I4, 1))
-        I5 = max(0, min(I5, 1))
-        I6 = max(0, min(I6, 1))
-
-        self.portIntensities[0] = I1
-        self.portIntensities[1] = I2
-        self.portIntensities[2] = I3
-        self.portIntensities[3] = I4
-        self.portIntensities[4] = I5
-        self.portIntensities[5] = I6
+        # Lecture dans la table précalculée (reconstruite si la disposition des actionneurs change)
+        intensities = self.intensityGrid.sample(x, y)
+        for port, intensity in enumerate(intensities):
+            self.portIntensities[port] = intensity
+        self.history.append(x, y, intensities)
 
     # Calcul Interpolation des intensités
     def get_Intensities(self, Iv, s_center_x, gamma, beta):
@@ -216,7 +190,7 @@ class PatternManager:
         return I1, I2, I3, I4, I5, I6
 
     def logIntensities(self, step):
-        for port in range(6):
+        for port in range(len(self.actuators)):
             self.logIntensity[port, step] = self.portIntensities[port]
 
     def visualizePattern(self):
@@ -227,13 +201,14 @@ class PatternManager:
         scatter = ax.scatter([], [])
         text = ax.text(0.05, 0.95, '', transform=ax.transAxes, verticalalignment='top')
 
-        centers = [(0.1, 0.1), (0.9, 0.1), (0.1, 0.9), (0.9, 0.9), (0.5, 0.1), (0.5, 0.9)]
+        centers = self.actuators.positions if isinstance(self.actuators, ActuatorLayout) else self.actuators
         for i, (xc, yc) in enumerate(centers):
             ax.text(xc, yc, f'Port {i+1}', fontsize=12, ha='center')
 
         while self.patternRunning:
-            if self.patternPosition:
-                x, y = self.patternPosition[-1]  
+            latest = self.history.latest()
+            if latest is not None:
+                _, (x, y), _ = latest
                 scatter.set_offsets(np.c_[[x], [y]])
                 intensities = '\n'.join([f'Port {port + 1}: {intensity:.2f}' for port, intensity in self.portIntensities.items()])
                 text.set_text(intensities)
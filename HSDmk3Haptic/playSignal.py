@@ -1,9 +1,16 @@
 import sounddevice as sd
 import numpy as np
 import time
+import threading
+from channelRouting import parseMapping, layoutMapping, routeActive, outputMapping
+from actuatorLayout import ActuatorLayout
 
 class PlaySignal:
     def __init__(self, signalSynth, patternManager, activePorts, mappingIntensity):
+        layout = patternManager.actuators
+        if isinstance(layout, ActuatorLayout):
+            # Disposition quelconque : chaque actionneur sur son canal (layout.channels), mapping ignoré
+            activePorts = list(layout.channels)
         self.activePorts = activePorts  
         self.numChannels = len(activePorts)
 
@@ -12,8 +19,16 @@ class PlaySignal:
         self.waveform = self.signalSynth.waveform  
         self.logIntensity = self.patternManager.logIntensity  
         self.mappingIntensity = mappingIntensity 
-
-        self.sample_rate = 48000
+        # Mapping analysé une seule fois : lignes du log et canaux physiques correspondants
+        if isinstance(layout, ActuatorLayout):
+            self.intensityRows, self.intensityChannels = layoutMapping(layout)
+        else:
+            self.intensityRows, self.intensityChannels = parseMapping(mappingIntensity, activePorts, self.logIntensity.shape[0])
+        self.interpolateSteps = False  # True : gains interpolés entre les pas du log
+        # Seuls les canaux actifs sont rendus ; sounddevice les place sur les sorties physiques
+        self.outputMapping = outputMapping(self.intensityChannels)
+
+        self.sample_rate = self.signalSynth.sampleRate  # Les WAV sont convertis à cette fréquence au chargement
         self.allChannels = 20  
         self.deviceList, self.defaultDevice = self.detectDevices()
         if len(self.deviceList) >= 2:
@@ -38,51 +53,96 @@ class PlaySignal:
         return device_list, default_device
 
     def signalWithIntensities(self):
-        waveformSample = len(self.waveform) // self.logIntensity.shape[1]
-        signal = np.zeros((len(self.waveform), self.allChannels))
-
-        for step in range(self.logIntensity.shape[1]):
-            start = step * waveformSample
-            end = start + waveformSample
-            
-            for keyIntensity, indexPort in self.mappingIntensity.items():
-                try:
-                    indexIntensity = int(keyIntensity[1:]) - 1  
-                    
-                    if indexIntensity >= 0 and indexIntensity < self.logIntensity.shape[0]:
-                        actualChannel = self.activePorts[indexPort]  
-                        
-                        stepIntensity = self.logIntensity[indexIntensity, step]
-                        signal[start:end, actualChannel] = self.waveform[start:end] * stepIntensity
-                    else:
-                        print(f"Avertissement: Indice d'intensité {indexIntensity} hors limites pour {keyIntensity}")
-                except (ValueError, IndexError) as e:
-                    print(f"Erreur lors du traitement de {keyIntensity}: {e}")
-
-        return signal
+        # Une colonne par canal actif (ordre de outputMapping), pas du log répartis sur tout le signal
+        # (même précision que le signal : float32 envoyé tel quel à sounddevice)
+        return routeActive(self.waveform, self.logIntensity, self.intensityRows, self.interpolateSteps)
 
-    def playSignal(self):
+    def availableChannels(self):
+        """Indices (dans outputMapping) des canaux actifs présents sur le périphérique, None si aucun"""
         if not self.deviceList:
             print("Aucun périphérique audio compatible trouvé.")
-            return
+            return None
 
-        signal = self.signalWithIntensities()
-        
+        mapping = self.outputMapping
         deviceInfo = sd.query_devices(self.deviceList[self.defaultDevice])
         availableChannels = deviceInfo['max_output_channels']
         
-        if availableChannels < self.allChannels:
-            print(f"Attention: Le périphérique sélectionné n'a que {availableChannels} canaux de sortie (20 requis)")
-            # Tronquer le signal pour n'utiliser que les canaux disponibles
-            signal = signal[:, :availableChannels]
+        # Sorties nécessaires : jusqu'au dernier canal actif du mapping (pas les 20 du HSDmk3)
+        requiredChannels = max(mapping, default=0)
+        keep = list(range(len(mapping)))
+        if availableChannels < requiredChannels:
+            print(f"Attention: Le périphérique sélectionné n'a que {availableChannels} canaux de sortie ({requiredChannels} requis)")
+            # Ne garder que les canaux actifs présents sur le périphérique
+            keep = [i for i, channel in enumerate(mapping) if channel <= availableChannels]
+
+        if not keep:
+            print("Aucun canal actif disponible sur le périphérique sélectionné : lecture annulée.")
+            return None
+        return keep
+
+    def playSignal(self):
+        keep = self.availableChannels()
+        if keep is None:
+            return
+
+        signal = self.signalWithIntensities()
+        mapping = [self.outputMapping[i] for i in keep]
+        if len(keep) < signal.shape[1]:
+            signal = np.ascontiguousarray(signal[:, keep])  # L'indexation par colonnes casse l'ordre C
         
         print(f"Lecture du signal sur les canaux {self.activePorts} du périphérique {self.defaultDevice}")
         
         sd.play(signal, 
                 samplerate=self.sample_rate, 
+                mapping=mapping,
                 device=self.deviceList[self.defaultDevice], 
                 blocking=True)
 
+    def playStream(self, blocksize=512):
+        """Lecture en flux : gains du pattern calculés par le callback audio, bloc par bloc
+
+        Pas de log précalculé : PatternManager.frameGenerator donne les gains de chaque bloc
+        (un cycle du pattern sur la durée du signal, comme le log étalé de playSignal).
+        Sans pattern courant, repli sur playSignal.
+        """
+        generator = self.patternManager.frameGenerator(self.sample_rate, len(self.waveform) / self.sample_rate)
+        if generator is None:
+            self.playSignal()
+            return
+        keep = self.availableChannels()
+        if keep is None:
+            return
+
+        rows = self.intensityRows[keep]
+        # Colonnes du flux = sorties physiques 1..max : chaque canal actif écrit dans la sienne
+        columns = np.array([self.outputMapping[i] - 1 for i in keep])
+        waveform = self.waveform
+        position = 0
+        finished = threading.Event()
+
+        def callback(outdata, frames, timeInfo, status):
+            nonlocal position
+            count = min(frames, len(waveform) - position)
+            outdata.fill(0)
+            if count > 0:
+                # Gains évalués sur les seuls échantillons joués (dernier bloc partiel inclus)
+                gains = np.asarray(generator.generate(count), dtype=outdata.dtype)[rows]
+                outdata[:count, columns] = waveform[position:position + count, None] * gains
+            position += count
+            if count < frames:
+                raise sd.CallbackStop
+
+        print(f"Lecture en flux sur les canaux {self.activePorts} du périphérique {self.defaultDevice}")
+
+        with sd.OutputStream(samplerate=self.sample_rate,
+                             channels=int(columns.max()) + 1,
+                             dtype=waveform.dtype,
+                             blocksize=blocksize,
+                             device=self.deviceList[self.defaultDevice],
+                             callback=callback,
+                             finished_callback=finished.set):
+            finished.wait()
+
     def stopSignal(self):
         sd.stop()
 
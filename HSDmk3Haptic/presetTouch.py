@@ -1,5 +1,5 @@
 class ParamTouch:
-    def __init__(self, signal, modulation, freq, amp, duration, pattern, speed, numRoundTrip=1):
+    def __init__(self, signal, modulation, freq, amp, duration, pattern, speed, numRoundTrip=1, seed=None):
         self.signal = signal
         self.modulation = modulation
         self.freq = freq
@@ -8,6 +8,7 @@ class ParamTouch:
         self.pattern = pattern
         self.speed = speed
         self.numRoundTrip = numRoundTrip
+        self.seed = seed  # Graine du tirage dans la banque de bruit (None = aléatoire, non mis en cache)
 
 class PresetsTouch:
     def __init__(self):
@@ -0,0 +1,53 @@
+import numpy as np
+import time
+
+
+def pulseTrain(numSamples, sampleRate, amp, interval=0.5, pulseDuration=0.01, numPulses=3, pulseSpacing=0.01, dtype=np.float64):
+    """Génère un train d'impulsions rectangulaires en une seule passe vectorisée"""
+    if numPulses <= 0 or numSamples <= 0:
+        return np.zeros(max(numSamples, 0), dtype=dtype)
+
+    # L'échantillon est actif si sa phase dans l'intervalle est sous l'un des seuils :
+    # le plus grand seuil (pulseDuration + j * pulseSpacing) suffit
+    threshold = max(pulseDuration + j * pulseSpacing for j in range(numPulses))
+
+    phase = np.remainder(np.arange(numSamples) / sampleRate, interval)
+    waveform = np.zeros(numSamples, dtype=dtype)
+    waveform[phase < threshold] = amp
+    return waveform
+
+
+def pulseTrainLoop(numSamples, sampleRate, amp, interval=0.5, pulseDuration=0.01, numPulses=3, pulseSpacing=0.01):
+    """Version de référence échantillon par échantillon (ancienne implémentation)"""
+    waveform = np.zeros(numSamples)
+    for i in range(numSamples):
+        for j in range(numPulses):
+            if (i / sampleRate) % interval < pulseDuration + j * pulseSpacing:
+                waveform[i] = amp
+    return waveform
+
+
+if __name__ == "__main__":
+    # Benchmark : boucle Python vs version vectorisée
+    sampleRate = 48000
+    duration = 2.0
+    numSamples = int(sampleRate * duration)
+
+    configs = {
+        "Tap": dict(interval=0.5, pulseDuration=0.01, numPulses=3, pulseSpacing=0.01),
+        "Train d'impulsion": dict(interval=0.05, pulseDuration=0.01, numPulses=1, pulseSpacing=0.0),
+    }
+
+    for name, params in configs.items():
+        start = time.perf_counter()
+        reference = pulseTrainLoop(numSamples, sampleRate, 0.1, **params)
+        loopTime = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for _ in range(100):
+            vectorized = pulseTrain(numSamples, sampleRate, 0.1, **params)
+        vecTime = (time.perf_counter() - start) / 100
+
+        identical = np.array_equal(reference, vectorized)
+        print(f"{name}: boucle {loopTime * 1e3:.1f} ms, vectorisé {vecTime * 1e3:.3f} ms "
+              f"(x{loopTime / vecTime:.0f}), identique : {identical}")
@@ -0,0 +1,153 @@
+import hashlib
+import json
+import os
+from collections import OrderedDict
+
+import numpy as np
+
+# Signaux basés sur du bruit : mis en cache uniquement si le preset fixe une graine
+NOISE_SIGNALS = ("Bruit Blanc", "Mixte")
+
+
+def presetFingerprint(preset, sampleRate, dtype=np.float64, renderRate=None):
+    """Empreinte des paramètres qui influencent le rendu du signal (None si non cachable)
+
+    renderRate : fréquence de synthèse interne, si elle diffère de la fréquence de sortie.
+    """
+    signal = preset.signal
+    seed = getattr(preset, 'seed', None)
+    if renderRate is not None and renderRate != sampleRate:
+        sampleRate = (sampleRate, renderRate)
+
+    if os.path.isfile(signal):
+        # La durée d'un preset WAV vient du fichier : on identifie la source par chemin, taille et date
+        stat = os.stat(signal)
+        source = (os.path.abspath(signal), stat.st_size, stat.st_mtime_ns)
+        fields = (source, preset.modulation, preset.amp, sampleRate, np.dtype(dtype).str)
+    else:
+        if signal in NOISE_SIGNALS and seed is None:
+            return None
+        fields = (signal, preset.modulation, preset.freq, preset.amp, preset.duration, sampleRate, seed,
+                  np.dtype(dtype).str)
+
+    return hashlib.sha1(repr(fields).encode('utf-8')).hexdigest()
+
+
+def trajectoryFingerprint(path, numSteps, layout):
+    """Empreinte d'un fichier de trajectoire compilé : source, nombre de pas, disposition des actionneurs"""
+    stat = os.stat(path)
+    source = (os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+    # Une ActuatorLayout (interpolation barycentrique) se distingue des positions brutes de la grille 2×3
+    fields = ("trajectory", source, numSteps, type(layout).__name__, getattr(layout, 'positions', layout))
+    return hashlib.sha1(repr(fields).encode('utf-8')).hexdigest()
+
+
+class RenderCache:
+    """Cache LRU en mémoire des signaux rendus, borné par un budget en octets"""
+
+    def __init__(self, maxBytes=64 * 1024 * 1024):
+        self.maxBytes = maxBytes
+        self.currentBytes = 0
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return entry[0]
+
+    def put(self, key, value):
+        """Stocke un tuple de rendu ; les tableaux sont passés en lecture seule"""
+        size = 0
+        for item in value:
+            if isinstance(item, np.ndarray):
+                item.setflags(write=False)
+                size += item.nbytes
+
+        if size > self.maxBytes:
+            return False
+
+        if key in self.entries:
+            self.currentBytes -= self.entries.pop(key)[1]
+
+        while self.entries and self.currentBytes + size > self.maxBytes:
+            _, (_, evictedSize) = self.entries.popitem(last=False)
+            self.currentBytes -= evictedSize
+            self.evictions += 1
+
+        self.entries[key] = (value, size)
+        self.currentBytes += size
+        return True
+
+    def clear(self):
+        self.entries.clear()
+        self.currentBytes = 0
+
+    def stats(self):
+        return {
+            "entries": len(self.entries),
+            "bytes": self.currentBytes,
+            "maxBytes": self.maxBytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+
+class DiskRenderCache:
+    """Cache persistant des rendus : tableaux .npy bruts rechargés en mémoire mappée"""
+
+    def __init__(self, directory):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self.hits = 0
+        self.misses = 0
+
+    def _arrayPath(self, key, name):
+        return os.path.join(self.directory, f"{key}_{name}.npy")
+
+    def _metaPath(self, key):
+        return os.path.join(self.directory, f"{key}.json")
+
+    def load(self, key):
+        """Renvoie (tableaux, métadonnées) ou None ; les tableaux sont en lecture seule (mmap)"""
+        try:
+            with open(self._metaPath(key), 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+            arrays = {name: np.load(self._arrayPath(key, name), mmap_mode='r') for name in meta["arrays"]}
+        except (OSError, ValueError, KeyError):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return arrays, meta
+
+    def save(self, key, arrays, meta=None):
+        """Écrit les tableaux puis les métadonnées, qui valident l'entrée en dernier"""
+        meta = dict(meta or {})
+        meta["arrays"] = list(arrays)
+        try:
+            for name, array in arrays.items():
+                path = self._arrayPath(key, name)
+                with open(path + ".tmp", 'wb') as f:
+                    np.save(f, np.ascontiguousarray(array))
+                os.replace(path + ".tmp", path)
+
+            metaPath = self._metaPath(key)
+            with open(metaPath + ".tmp", 'w', encoding='utf-8') as f:
+                json.dump(meta, f)
+            os.replace(metaPath + ".tmp", metaPath)
+        except OSError as e:
+            print(f"Impossible d'écrire le cache disque ({key}) : {e}")
+            return False
+        return True
+
+    def clear(self):
+        for name in os.listdir(self.directory):
+            if name.endswith((".npy", ".json", ".tmp")):
+                os.remove(os.path.join(self.directory, name))
@@ -0,0 +1,139 @@
+import math
+from functools import lru_cache
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from scipy.signal import firwin, resample_poly, upfirdn
+
+
+def rateRatio(fsIn, fsOut):
+    """Rapport de conversion réduit (up, down) entre deux fréquences d'échantillonnage"""
+    fsIn, fsOut = int(round(fsIn)), int(round(fsOut))
+    g = math.gcd(fsIn, fsOut)
+    return fsOut // g, fsIn // g
+
+
+@lru_cache(maxsize=16)
+def polyphaseFilter(up, down):
+    """FIR anti-repliement identique à celui de resample_poly, précédé de son retard d'alignement"""
+    maxRate = max(up, down)
+    halfLen = 10 * maxRate
+    h = firwin(2 * halfLen + 1, 1. / maxRate, window=('kaiser', 5.0)) * up
+
+    # Zéros en tête pour centrer les échantillons de sortie (comme resample_poly)
+    nPrePad = down - halfLen % down
+    nPreRemove = (halfLen + nPrePad) // down
+    return np.concatenate((np.zeros(nPrePad), h)), nPreRemove
+
+
+@lru_cache(maxsize=16)
+def upsamplerBank(up, dtype=np.float64):
+    """Filtre de resample_poly rangé en `up` phases : bank[p, i] = h[p + up * (taps - 1 - i)]"""
+    halfLen = 10 * up
+    h = firwin(2 * halfLen + 1, 1. / up, window=('kaiser', 5.0)) * up
+    taps = 2 * halfLen // up + 1
+    h = np.concatenate((h, np.zeros(taps * up - len(h))))
+    bank = np.ascontiguousarray(h.reshape(taps, up)[::-1].T, dtype=dtype)
+    bank.setflags(write=False)
+    return bank, halfLen // up
+
+
+def upsampleSignal(data, up):
+    """Suréchantillonnage entier par `up`, identique à resample_poly(data, up, 1)
+
+    Chaque échantillon d'entrée produit `up` sorties : le calcul se ramène à un produit
+    matriciel entre les fenêtres glissantes de l'entrée et les phases du filtre.
+    """
+    data = np.asarray(data)
+    dtype = np.float32 if data.dtype == np.float32 else np.float64
+    bank, pad = upsamplerBank(up, dtype)
+    windows = sliding_window_view(np.pad(data.astype(dtype, copy=False), pad), bank.shape[1])
+    return (windows @ bank.T).ravel()
+
+
+def resampleSignal(data, fsIn, fsOut):
+    """Convertit un signal complet de fsIn vers fsOut (filtrage polyphase)"""
+    up, down = rateRatio(fsIn, fsOut)
+    if up == down:
+        return np.asarray(data)
+    if down == 1:
+        return upsampleSignal(data, up)
+    return resample_poly(data, up, down)
+
+
+class StreamResampler:
+    """Conversion polyphase par blocs, identique à resample_poly sur le signal concaténé"""
+
+    def __init__(self, fsIn, fsOut):
+        self.fsIn = fsIn
+        self.fsOut = fsOut
+        self.up, self.down = rateRatio(fsIn, fsOut)
+        self.h, self.nPreRemove = polyphaseFilter(self.up, self.down)
+        self.reset()
+
+    def reset(self):
+        self.history = np.zeros(0)
+        self.historyStart = 0   # Indice d'entrée (global) du premier échantillon conservé
+        self.nextOut = 0        # Indice (global, avant retrait du retard) de la prochaine sortie
+        self.totalIn = 0
+
+    def _run(self, block):
+        up, down = self.up, self.down
+        buf = np.concatenate((self.history, block)) if len(self.history) else np.asarray(block, dtype=np.float64)
+        bufEnd = self.historyStart + len(buf)
+
+        # Une sortie m est complète dès que m * down < bufEnd * up
+        outEnd = (bufEnd * up + down - 1) // down
+        first = self.historyStart * up // down   # historyStart est multiple de down
+        y = upfirdn(self.h, buf, up, down)[self.nextOut - first:outEnd - first]
+        self.nextOut = outEnd
+
+        # Conserver l'historique nécessaire aux prochaines sorties, aligné sur un multiple de down
+        keepFrom = max((outEnd * down - len(self.h) + 1) // up, 0) // down * down
+        keepFrom = max(keepFrom, self.historyStart)
+        self.history = buf[keepFrom - self.historyStart:]
+        self.historyStart = keepFrom
+        return y
+
+    def _trim(self, y, start):
+        # Retirer le retard du filtre et ne pas dépasser la longueur attendue
+        nOut = -(-self.totalIn * self.up // self.down)
+        lo = max(self.nPreRemove - start, 0)
+        hi = max(self.nPreRemove + nOut - start, 0)
+        return y[lo:hi]
+
+    def process(self, block):
+        """Convertit un bloc ; la sortie est retardée tant que le filtre n'est pas rempli"""
+        if self.up == self.down:
+            return np.asarray(block)
+        self.totalIn += len(block)
+        start = self.nextOut
+        y = self._run(np.asarray(block, dtype=np.float64))
+        # Les sorties au-delà de la fin courante seront produites par flush()
+        lo = max(self.nPreRemove - start, 0)
+        return y[lo:]
+
+    def flush(self):
+        """Termine la conversion en produisant les dernières sorties"""
+        if self.up == self.down:
+            return np.zeros(0)
+        nOut = -(-self.totalIn * self.up // self.down)
+        missing = self.nPreRemove + nOut - self.nextOut
+        if missing <= 0:
+            return np.zeros(0)
+        start = self.nextOut
+        zeros = np.zeros(-(-missing * self.down // self.up) + 1)
+        y = self._run(zeros)
+        return self._trim(y, start)
+
+
+def resampleBlocks(blocks, fsIn, fsOut):
+    """Générateur : convertit une suite de blocs à la volée"""
+    resampler = StreamResampler(fsIn, fsOut)
+    for block in blocks:
+        y = resampler.process(block)
+        if len(y):
+            yield y
+    tail = resampler.flush()
+    if len(tail):
+        yield tail
@@ -0,0 +1,387 @@
+import os
+import time
+
+import numpy as np
+
+from filterDesign import ChunkFilter
+from envelopes import applyEnvelopeBlock
+from noiseBank import NoiseBank
+from resampler import resampleBlocks
+from wavStream import wavBlocks, wavInfo
+
+BLOCK_SIZE = 4096
+# Contenu le plus haut de chaque famille (les WAV sont filtrés à 1 kHz, le bruit du "Mixte" à 500 Hz)
+WAV_CUTOFF = 1000.0
+MIXTE_NOISE_CUTOFF = 500.0
+
+
+class Node:
+    """Nœud d'un graphe de signal, évalué paresseusement bloc par bloc
+
+    Chaque nœud écrit dans son propre buffer, alloué une fois à la taille du bloc :
+    aucun tableau de la longueur du signal n'est créé. Un nœud partagé par plusieurs
+    branches n'est calculé qu'une fois par bloc.
+    """
+
+    def __init__(self, sampleRate, inputs=(), dtype=np.float64):
+        self.sampleRate = sampleRate
+        self.inputs = list(inputs)
+        self.dtype = np.dtype(dtype)
+        self.buffer = np.zeros(0, dtype=self.dtype)
+        self.position = 0   # Indice du premier échantillon du prochain bloc
+        self._tick = None
+        self._last = None
+
+    def reset(self):
+        self.position = 0
+        self._tick = None
+        for node in self.inputs:
+            node.reset()
+        self._reset()
+
+    def _reset(self):
+        pass
+
+    def _compute(self, out, tick):
+        raise NotImplementedError
+
+    def pull(self, frames, tick):
+        """Bloc de `frames` échantillons pour l'évaluation numéro `tick` (vue sur le buffer du nœud)"""
+        if tick == self._tick:
+            return self._last
+        if len(self.buffer) < frames:
+            self.buffer = np.empty(frames, dtype=self.dtype)
+        out = self.buffer[:frames]
+        self._compute(out, tick)
+        self.position += frames
+        self._tick = tick
+        self._last = out
+        return out
+
+    # Composition : a + b, a * 0.5, a * b
+    def __add__(self, other):
+        return Mix(self, other)
+
+    def __mul__(self, other):
+        if isinstance(other, Node):
+            return Product(self, other)
+        return Gain(self, other)
+
+    __rmul__ = __mul__
+
+
+class Sine(Node):
+    """Sinusoïde à phase continue d'un bloc à l'autre"""
+
+    def __init__(self, sampleRate, freq, dtype=np.float64):
+        super().__init__(sampleRate, dtype=dtype)
+        self.freq = freq
+        self.ramp = np.zeros(0)
+
+    def _compute(self, out, tick):
+        frames = len(out)
+        if len(self.ramp) < frames:
+            self.ramp = np.arange(frames, dtype=np.float64)
+        # Phase de début de bloc réduite à [0, 1) : pas de perte de précision sur les longs flux
+        phase = (self.position * self.freq / self.sampleRate) % 1.0
+        cycles = self.ramp[:frames] * (self.freq / self.sampleRate)
+        cycles += phase
+        np.sin(2 * np.pi * cycles, out=out, casting='same_kind')
+
+
+class PulseTrain(Node):
+    """Train d'impulsions rectangulaires d'amplitude 1 (mêmes paramètres que pulseTrain)"""
+
+    def __init__(self, sampleRate, interval=0.5, pulseDuration=0.01, numPulses=3, pulseSpacing=0.01, dtype=np.float64):
+        super().__init__(sampleRate, dtype=dtype)
+        self.interval = interval
+        self.threshold = max((pulseDuration + j * pulseSpacing for j in range(numPulses)), default=0.0)
+        self.active = numPulses > 0
+
+    def _compute(self, out, tick):
+        if not self.active:
+            out[:] = 0
+            return
+        phase = np.remainder((self.position + np.arange(len(out))) / self.sampleRate, self.interval)
+        np.less(phase, self.threshold, out=out, casting='unsafe')
+
+
+class Noise(Node):
+    """Bruit filtré lu en continu dans une table de NoiseBank (décalage tiré à chaque reset)
+
+    Jusqu'à la longueur d'une table, le résultat est celui de NoiseBank.segment avec la même graine ;
+    au-delà, la table circulaire est relue en boucle.
+    """
+
+    def __init__(self, noiseBank, cutoff, seed=None, scale=1.0):
+        super().__init__(noiseBank.sampleRate, dtype=noiseBank.dtype)
+        self.noiseBank = noiseBank
+        self.cutoff = cutoff
+        self.seed = seed
+        self.scale = scale
+        self._reset()
+
+    def _reset(self):
+        self.table = self.noiseBank.getTable(self.cutoff)
+        rng = np.random.default_rng(self.seed) if self.seed is not None else self.noiseBank.rng
+        self.offset = int(rng.integers(len(self.table)))
+
+    def _compute(self, out, tick):
+        table = self.table
+        filled = 0
+        while filled < len(out):
+            n = min(len(out) - filled, len(table) - self.offset)
+            out[filled:filled + n] = table[self.offset:self.offset + n]
+            filled += n
+            self.offset = (self.offset + n) % len(table)
+        if self.scale != 1.0:
+            out *= self.scale
+
+
+class WavSource(Node):
+    """Fichier WAV mono normalisé, converti à la fréquence du graphe, lu bloc par bloc
+
+    Après la fin du fichier, le nœud produit des zéros.
+    """
+
+    def __init__(self, filepath, sampleRate, amp=1.0, readSize=65536, dtype=np.float64):
+        super().__init__(sampleRate, dtype=dtype)
+        self.filepath = filepath
+        self.amp = amp
+        self.readSize = readSize
+        self.fileRate, total, self.duration = wavInfo(filepath)
+        self.numSamples = -(-total * int(sampleRate) // int(self.fileRate))
+        self._reset()
+
+    def _reset(self):
+        blocks = wavBlocks(self.filepath, self.readSize, self.amp)
+        if self.fileRate != self.sampleRate:
+            blocks = resampleBlocks(blocks, self.fileRate, self.sampleRate)
+        self.blocks = blocks
+        self.pending = np.zeros(0)
+
+    def _compute(self, out, tick):
+        filled = 0
+        while filled < len(out):
+            if len(self.pending) == 0:
+                self.pending = next(self.blocks, None)
+                if self.pending is None:
+                    self.pending = np.zeros(0)
+                    out[filled:] = 0
+                    return
+            n = min(len(out) - filled, len(self.pending))
+            out[filled:filled + n] = self.pending[:n]
+            self.pending = self.pending[n:]
+            filled += n
+
+
+class Lowpass(Node):
+    """Butterworth passe-bas dont l'état est conservé d'un bloc à l'autre"""
+
+    def __init__(self, source, cutoff, order=5):
+        super().__init__(source.sampleRate, (source,), source.dtype)
+        self.cutoff = cutoff
+        self.filter = ChunkFilter(cutoff, source.sampleRate, order)
+
+    def _reset(self):
+        self.filter.reset()
+
+    def _compute(self, out, tick):
+        out[:] = self.filter.process(self.inputs[0].pull(len(out), tick))
+
+
+class Gain(Node):
+    def __init__(self, source, gain):
+        super().__init__(source.sampleRate, (source,), source.dtype)
+        self.gain = gain
+
+    def _compute(self, out, tick):
+        np.multiply(self.inputs[0].pull(len(out), tick), self.gain, out=out, casting='same_kind')
+
+
+class Mix(Node):
+    """Somme de plusieurs nœuds"""
+
+    def __init__(self, *sources):
+        super().__init__(sources[0].sampleRate, sources, sources[0].dtype)
+
+    def _compute(self, out, tick):
+        out[:] = self.inputs[0].pull(len(out), tick)
+        for node in self.inputs[1:]:
+            out += node.pull(len(out), tick)
+
+
+class Product(Node):
+    """Produit de deux nœuds (modulation en anneau, enveloppe calculée par un autre nœud)"""
+
+    def __init__(self, a, b):
+        super().__init__(a.sampleRate, (a, b), a.dtype)
+
+    def _compute(self, out, tick):
+        np.multiply(self.inputs[0].pull(len(out), tick), self.inputs[1].pull(len(out), tick), out=out)
+
+
+class Envelope(Node):
+    """Enveloppe de la bibliothèque partagée, pour un signal de numSamples échantillons
+
+    Avec loop=True l'enveloppe recommence tous les numSamples échantillons ; sinon elle vaut 1 au-delà.
+    """
+
+    def __init__(self, source, modulationType, numSamples, loop=False):
+        super().__init__(source.sampleRate, (source,), source.dtype)
+        self.modulationType = modulationType
+        self.numSamples = numSamples
+        self.loop = loop
+
+    def _compute(self, out, tick):
+        out[:] = self.inputs[0].pull(len(out), tick)
+        start = self.position % self.numSamples if self.loop else self.position
+        done = 0
+        while done < len(out) and start < self.numSamples:
+            n = min(len(out) - done, self.numSamples - start)
+            applyEnvelopeBlock(out[done:done + n], self.modulationType, self.sampleRate, self.numSamples, start)
+            done += n
+            start = 0 if self.loop else start + n
+
+
+class SignalGraph:
+    """Sortie d'un graphe : rendu hors ligne complet ou génération bloc par bloc pour le flux audio
+
+    Avec loop=True, le graphe repart de zéro tous les numSamples échantillons (même bouclage
+    que la relecture d'un buffer de numSamples échantillons, sans ce buffer).
+    """
+
+    def __init__(self, output, numSamples=None, loop=False):
+        self.output = output
+        self.numSamples = numSamples
+        self.sampleRate = output.sampleRate
+        self.dtype = output.dtype
+        self.loop = loop and numSamples is not None
+        self.tick = 0
+        self.loopBuffer = np.zeros(0, dtype=self.dtype)
+
+    @property
+    def duration(self):
+        return self.numSamples / self.sampleRate
+
+    def reset(self):
+        self.output.reset()
+
+    def generate(self, frames):
+        """Bloc suivant de `frames` échantillons (mêmes appels que Oscillator.generate)
+
+        Le bloc est une vue sur un buffer réutilisé : à consommer avant l'appel suivant.
+        Au-delà de numSamples, la sortie est silencieuse (ou le graphe reprend au début avec loop).
+        """
+        if self.loop:
+            return self._generateLoop(frames)
+        self.tick += 1
+        position = self.output.position
+        block = self.output.pull(frames, self.tick)
+        if self.numSamples is not None and position + frames > self.numSamples:
+            block[max(self.numSamples - position, 0):] = 0
+        return block
+
+    def _generateLoop(self, frames):
+        if len(self.loopBuffer) < frames:
+            self.loopBuffer = np.empty(frames, dtype=self.dtype)
+        out = self.loopBuffer[:frames]
+        filled = 0
+        while filled < frames:
+            if self.output.position >= self.numSamples:
+                self.reset()
+            n = min(frames - filled, self.numSamples - self.output.position)
+            self.tick += 1
+            out[filled:filled + n] = self.output.pull(n, self.tick)
+            filled += n
+        return out
+
+    def render(self, numSamples=None, blockSize=BLOCK_SIZE):
+        """Rendu hors ligne depuis le début dans un unique buffer de sortie"""
+        numSamples = self.numSamples if numSamples is None else numSamples
+        self.reset()
+        output = np.empty(numSamples, dtype=self.dtype)
+        for start in range(0, numSamples, blockSize):
+            frames = min(blockSize, numSamples - start)
+            output[start:start + frames] = self.generate(frames)
+        return output
+
+
+def compilePreset(preset, sampleRate=48000, noiseBank=None, dtype=np.float64, noiseScale=1.0, loop=False,
+                  mixteNoiseGain=10.0):
+    """Compile un ParamTouch en SignalGraph (chaînes de traitement de SignalSynth)
+
+    loop=True : graphe rejoué en boucle pour le flux audio. mixteNoiseGain : gain du bruit
+    du "Mixte" relatif à l'amplitude (10 pour SignalSynth, 2 pour l'interface audioGen).
+    """
+    signal = preset.signal
+    seed = getattr(preset, 'seed', None)
+    if noiseBank is None and signal in ("Bruit Blanc", "Mixte"):
+        noiseBank = NoiseBank(sampleRate, dtype=dtype)
+
+    if os.path.isfile(signal):
+        source = WavSource(signal, sampleRate, amp=preset.amp, dtype=dtype)
+        numSamples = int(sampleRate * source.duration)
+        node = Lowpass(source, WAV_CUTOFF)
+    else:
+        numSamples = int(sampleRate * preset.duration)
+        if signal in ("Sinusoïdale", "Sinusoïdal"):
+            node = Sine(sampleRate, preset.freq, dtype) * preset.amp
+        elif signal == "Bruit Blanc":
+            node = Noise(noiseBank, preset.freq, seed, noiseScale) * (preset.amp * 10)
+        elif signal == "Tap":
+            node = PulseTrain(sampleRate, interval=0.5, pulseDuration=0.01, numPulses=3, pulseSpacing=0.01,
+                              dtype=dtype) * preset.amp
+        elif signal == "Mixte":
+            node = (Sine(sampleRate, preset.freq, dtype) * preset.amp
+                    + Noise(noiseBank, MIXTE_NOISE_CUTOFF, seed, noiseScale) * (preset.amp * mixteNoiseGain))
+        else:
+            raise ValueError(f"Type de signal non supporté: {signal}")
+
+    if preset.modulation != "Aucune":
+        node = Envelope(node, preset.modulation, numSamples)
+    return SignalGraph(node, numSamples, loop)
+
+
+if __name__ == "__main__":
+    # Comparaison avec le rendu pleine longueur (render_batch) : rendu par blocs, flux et mémoire de pointe
+    import tracemalloc
+    from batchRender import render_batch
+    from signalSynth import SignalSynth
+    from presetTouch import ParamTouch
+
+    synth = SignalSynth(cacheBytes=0)
+    presets = {
+        "Sinusoïdale": ParamTouch("Sinusoïdale", "Fade In/Out", 100.0, 0.1, 4.0, None, 1.0),
+        "Bruit Blanc": ParamTouch("Bruit Blanc", "Fade In/Out", 250.0, 0.2, 4.0, None, 1.0, seed=1),
+        "Tap": ParamTouch("Tap", "Aucune", 150.0, 0.1, 4.0, None, 1.0),
+        "Mixte": ParamTouch("Mixte", "Impulsion", 150.0, 0.1, 4.0, None, 1.0, seed=1),
+    }
+    for name, preset in presets.items():
+        _, reference = render_batch([preset], synth)[preset]
+        graph = synth.compileGraph(preset)
+
+        start = time.perf_counter()
+        rendered = graph.render()
+        renderTime = time.perf_counter() - start
+
+        # Flux : un bloc de 512 échantillons par callback, sans tableau pleine longueur
+        graph.reset()
+        tracemalloc.start()
+        streamed = np.concatenate([graph.generate(512).copy() for _ in range(-(-graph.numSamples // 512))])
+        tracemalloc.stop()
+        tracemalloc.start()
+        for _ in range(-(-graph.numSamples // 512)):
+            graph.generate(512)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        print(f"{name:<12} rendu {renderTime * 1e3:.2f} ms, écart pleine longueur {np.max(np.abs(rendered - reference)):.1e}, "
+              f"écart flux {np.max(np.abs(streamed[:len(rendered)] - rendered)):.1e}, pic flux {peak / 1e3:.0f} ko")
+
+    # Flux en boucle (interface audioGen) : identique à la relecture du buffer rendu
+    looped = synth.compileGraph(presets["Tap"], loop=True)
+    rendered = looped.render()
+    looped.reset()
+    streamed = np.concatenate([looped.generate(2048).copy() for _ in range(3 * len(rendered) // 2048)])
+    print(f"Tap en boucle : écart avec le buffer relu {np.max(np.abs(streamed - np.resize(rendered, len(streamed)))):.1e}")
@@ -1,136 +1,197 @@
 import numpy as np
-from scipy.signal import butter, lfilter
 import matplotlib.pyplot as plt
 import wave
 import os
 from presetTouch import PresetsTouch
-from scipy.io import wavfile
+from filterDesign import filterSignal
+from renderCache import RenderCache, DiskRenderCache, presetFingerprint
+from noiseBank import NoiseBank
+from wavStream import openWav, normalizeBlock, wavInfo
+from envelopes import envelope
+from resampler import resampleSignal
+from signalGraph import compilePreset, WAV_CUTOFF, MIXTE_NOISE_CUTOFF
+
+# Part de la bande de Nyquist utilisable à la fréquence interne (marge pour le filtre de conversion)
+MAX_BAND = 0.4
+# Toujours rendus à la fréquence de sortie : Tap (fronts raides, large bande) et Bruit Blanc
+# (simple copie d'une table préfiltrée, moins chère que le suréchantillonnage)
+FULL_RATE_SIGNALS = ("Tap", "Bruit Blanc")
 
 class SignalSynth:
-    def __init__(self, sampleRate=48000):
+    def __init__(self, sampleRate=48000, cacheBytes=64 * 1024 * 1024, cacheDir=None, dtype=np.float64,
+                 internalRate=None):
         self.sampleRate = sampleRate
+        # Fréquence de synthèse (ex. 4000) : le rendu est suréchantillonné une seule fois à la fin
+        self.internalRate = internalRate
+        self.dtype = np.dtype(dtype)  # np.float32 : rendu en simple précision de bout en bout
         self.duration = 2.0
         self.waveform = None
         self.freq = 100.0
         self.amp = 0.1
         self.signalType = "Sinusoïdal"
         self.modulationType = "Aucune"
+
+        # Cache des rendus (désactivé si cacheBytes vaut 0 ou None)
+        self.renderCache = RenderCache(cacheBytes) if cacheBytes else None
+        # Cache disque persistant entre deux lancements (désactivé si cacheDir vaut None)
+        self.diskCache = DiskRenderCache(cacheDir) if cacheDir else None
+
+        # Tables de bruit filtré précalculées pour "Bruit Blanc" et "Mixte", une banque par fréquence
+        self.noiseBanks = {}
     
-    def configureSignalFromPreset(self, preset):
+    def _setPreset(self, preset):
         self.signalType = preset.signal
         self.modulationType = preset.modulation
         self.freq = preset.freq
         self.amp = preset.amp
         self.duration = preset.duration
-        return self.generateSignal(preset)
+
+    def configureSignalFromPreset(self, preset):
+        self._setPreset(preset)
+
+        rate = self.renderRate(preset)
+        useCache = self.renderCache is not None or self.diskCache is not None
+        key = presetFingerprint(preset, self.sampleRate, self.dtype, renderRate=rate) if useCache else None
+        if key is not None:
+            cached = self.loadCachedRender(key)
+            if cached is not None:
+                t, waveform, rate, self.duration = cached
+                preset.duration = self.duration
+                self.t, self.waveform = self.upsample(t, waveform, rate, self.duration)
+                return self.t, self.waveform
+
+        t, waveform = self.generateSignal(preset, rate)
+        if key is not None:
+            # Le cache garde le rendu à la fréquence interne
+            self.storeCachedRender(key, t, waveform, self.duration, rate)
+        self.t, self.waveform = self.upsample(t, waveform, rate, self.duration)
+        return self.t, self.waveform
+
+    def renderPreset(self, preset):
+        """Rendu à la fréquence de synthèse, sans cache ni suréchantillonnage : (t, waveform, rate)"""
+        self._setPreset(preset)
+        rate = self.renderRate(preset)
+        t, waveform = self.generateSignal(preset, rate)
+        return t, waveform, rate
+
+    def renderRate(self, preset):
+        """Fréquence de synthèse d'un preset : la fréquence interne si son contenu y tient"""
+        if not self.internalRate or self.internalRate >= self.sampleRate:
+            return self.sampleRate
+        if os.path.isfile(preset.signal):
+            highest = WAV_CUTOFF
+        elif preset.signal in FULL_RATE_SIGNALS:
+            return self.sampleRate
+        elif preset.signal == "Mixte":
+            highest = max(preset.freq, MIXTE_NOISE_CUTOFF)
+        else:
+            highest = preset.freq
+        return self.internalRate if highest < MAX_BAND * self.internalRate else self.sampleRate
+
+    def upsample(self, t, waveform, rate, duration):
+        """Ramène un rendu à la fréquence de sortie (un seul passage polyphase)"""
+        if rate == self.sampleRate:
+            return t, waveform
+        output = resampleSignal(waveform, rate, self.sampleRate).astype(self.dtype, copy=False)
+        t = np.linspace(0, duration, len(output), endpoint=False, dtype=self.dtype)
+        return t, output
+
+    def noiseBankFor(self, rate):
+        bank = self.noiseBanks.get(rate)
+        if bank is None:
+            bank = self.noiseBanks[rate] = NoiseBank(rate, dtype=self.dtype)
+        return bank
+
+    def noiseScale(self, rate):
+        # Un bruit blanc unitaire à `rate` porte sampleRate / rate fois plus d'énergie par Hz
+        return np.sqrt(rate / self.sampleRate)
+
+    def noiseSegment(self, cutoff, n, rate, seed=None):
+        """Bruit unitaire filtré à `cutoff`, à la même densité spectrale quelle que soit la fréquence"""
+        noise = self.noiseBankFor(rate).segment(cutoff, n, seed)
+        if rate != self.sampleRate:
+            noise *= self.noiseScale(rate)
+        return noise
+
+    def compileGraph(self, preset, rate=None, loop=False):
+        """Graphe de signal du preset, évalué par blocs (rendu hors ligne ou flux audio, en boucle avec loop)"""
+        rate = self.sampleRate if rate is None else rate
+        return compilePreset(preset, rate, self.noiseBankFor(rate), self.dtype, self.noiseScale(rate), loop)
+
+    def storeCachedRender(self, key, t, waveform, duration, rate=None):
+        rate = self.sampleRate if rate is None else rate
+        if self.diskCache is not None:
+            self.diskCache.save(key, {"waveform": waveform},
+                                {"sampleRate": rate, "duration": duration})
+        if self.renderCache is not None:
+            self.renderCache.put(key, (t, waveform, rate, duration))
+
+    def loadCachedRender(self, key):
+        if self.renderCache is not None:
+            cached = self.renderCache.get(key)
+            if cached is not None:
+                return cached
+
+        if self.diskCache is None:
+            return None
+        stored = self.diskCache.load(key)
+        if stored is None:
+            return None
+
+        # Le signal reste mappé sur disque, seul l'axe temporel est recalculé
+        arrays, meta = stored
+        waveform = arrays["waveform"]
+        t = np.linspace(0, meta["duration"], len(waveform), endpoint=False, dtype=self.dtype)
+        cached = (t, waveform, meta["sampleRate"], meta["duration"])
+        if self.renderCache is not None:
+            self.renderCache.put(key, cached)
+        return cached
     
 
     def loadWav(self, filepath):
-        fs, audio_data = wavfile.read(filepath)
+        fs, audio_data = openWav(filepath)
 
-        # Convertir en float32
-        if audio_data.dtype == np.int16:
-            audio_data = audio_data.astype(np.float32) / 32768.0
-        elif audio_data.dtype == np.int32:
-            audio_data = audio_data.astype(np.float32) / 2147483648.0
-        elif audio_data.dtype == np.uint8:
-            audio_data = (audio_data.astype(np.float32) - 128) / 128.0
-
-        # Si stéréo, faire une moyenne (mono)
-        if len(audio_data.shape) == 2:
-            audio_data = np.mean(audio_data, axis=1)
+        # Convertir en float32 mono
+        audio_data = normalizeBlock(audio_data)
 
         duration = audio_data.shape[0] / fs
 
         return audio_data, fs, duration
 
-    def generateSignal(self, preset):
+    def generateSignal(self, preset, rate=None):
+        # Le preset est compilé en graphe puis rendu par blocs dans un unique buffer de sortie
+        rate = self.sampleRate if rate is None else rate
         if os.path.isfile(self.signalType):
             try:
-                audio_signal, fs, duration = self.loadWav(self.signalType)
+                _, _, duration = wavInfo(self.signalType)
 
-                self.sampleRate = fs
                 self.duration = duration
                 preset.duration = self.duration  # Mettre à jour la durée dans le preset
 
-                # Recréer l'axe temporel avec la vraie durée
-                self.t = np.linspace(0, self.duration, int(self.sampleRate * self.duration), endpoint=False)
-
-                self.waveform = self.amp * audio_signal
-
-                self.waveform = self.lowpassFilter(self.waveform, 1000, self.sampleRate)
-
-                if len(self.waveform) > len(self.t):
-                    self.waveform = self.waveform[:len(self.t)]
-                elif len(self.waveform) < len(self.t):
-                    self.waveform = np.pad(self.waveform, (0, len(self.t) - len(self.waveform)), 'constant')
+                # Lecture, conversion de fréquence, normalisation et filtrage par blocs
+                graph = self.compileGraph(preset, rate)
 
             except Exception as e:
                 raise ValueError(f"Erreur lors de la lecture du fichier audio : {e}")
         else:
-            # Sinon, comportement normal
-            self.t = np.linspace(0, self.duration, int(self.sampleRate * self.duration), endpoint=False)
-
-            if self.signalType == "Sinusoïdale":
-                self.waveform = self.amp * np.sin(2 * np.pi * self.freq * self.t)
-            elif self.signalType == "Bruit Blanc":
-                self.waveform = self.amp * np.random.normal(0, 10, len(self.t))
-                self.waveform = self.lowpassFilter(self.waveform, self.freq, self.sampleRate)
-            elif self.signalType == "Tap":
-                interval = 0.5
-                pulse_duration = 0.01
-                num_pulses = 3
-                pulse_spacing = 0.01
-                self.waveform = np.zeros_like(self.t)
-                for i in range(len(self.t)):
-                    for j in range(num_pulses):
-                        if (i / self.sampleRate) % interval < pulse_duration + j * pulse_spacing:
-                            self.waveform[i] = self.amp
-            elif self.signalType == "Mixte":
-                sinWave = self.amp * np.sin(2 * np.pi * self.freq * self.t)
-                noise = self.amp * np.random.normal(0, 10, len(self.t))
-                noise = self.lowpassFilter(noise, 500, self.sampleRate)
-                self.waveform = sinWave + noise
-            else:
-                raise ValueError(f"Type de signal non supporté: {self.signalType}")
-
-        self.waveform *= self.applyModulation()
+            graph = self.compileGraph(preset, rate)
+
+        # Axe temporel à la fréquence de synthèse (vraie durée pour un WAV)
+        self.t = np.linspace(0, self.duration, graph.numSamples, endpoint=False, dtype=self.dtype)
+        self.waveform = graph.render()
 
         return self.t, self.waveform
 
 
-    def applyModulation(self):
-        if self.modulationType == "Aucune":
-            return np.ones_like(self.t)
-        elif self.modulationType == "Sinusoïdale":
-            modulation = 0.5 * (1 + np.sin(2 * np.pi * 0.5 * self.t))
-            return modulation
-        elif self.modulationType == "Impulsion":
-            attack_time = 0.01  
-            decay_time = 0.05    
-            mod_signal = np.zeros_like(self.t)
-            mod_signal[self.t < attack_time] = self.t[self.t < attack_time] / attack_time
-            mod_signal[(self.t >= attack_time) & (self.t < attack_time + decay_time)] = 1 - ((self.t[(self.t >= attack_time) & (self.t < attack_time + decay_time)] - attack_time) / decay_time)
-            return mod_signal
-        elif self.modulationType == "Fade In/Out":
-            # Modulation de type fade in/out
-            fade_in_time = 0.1  # Temps de fade in
-            fade_out_time = 0.1  # Temps de fade out
-            mod_signal = np.ones_like(self.t)
-            fade_in = (self.t < fade_in_time)
-            fade_out = (self.t > (self.t[-1] - fade_out_time))
-            mod_signal[fade_in] = self.t[fade_in] / fade_in_time
-            mod_signal[fade_out] = (self.t[-1] - self.t[fade_out]) / fade_out_time
-            return mod_signal
-        else:
-            raise ValueError(f"Type de modulation non supporté: {self.modulationType}")
+    def applyModulation(self, t=None, modulationType=None):
+        # Enveloppe complète (bibliothèque partagée avec l'interface, tables en cache)
+        t = self.t if t is None else t
+        modulationType = self.modulationType if modulationType is None else modulationType
+        return envelope(modulationType, len(t), self.sampleRate, dtype=t.dtype)
 
     def lowpassFilter(self, data, cutoff, fs, order=5):
-        nyquist = 0.5 * fs
-        normal_cutoff = cutoff / nyquist
-        b, a = butter(order, normal_cutoff, btype='low', analog=False)
-        y = lfilter(b, a, data)
-        return y
+        # Conception mise en cache, filtrage en sections du second ordre (précision de data conservée)
+        return filterSignal(data, cutoff, fs, order, btype='low')
 
 
 if __name__ == "__main__":
@@ -174,10 +235,14 @@ if __name__ == "__main__":
     if num_presets == 1:
         axes = [axes]  # S'assurer que axes est une liste même pour un seul subplot
 
+    # Rendu groupé de tous les presets (WAV rendus en parallèle)
+    from batchRender import render_batch
+    rendered = render_batch(carresse_presets, synth)
+
     for i, preset in enumerate(carresse_presets):
-        t, waveform = synth.configureSignalFromPreset(preset)
+        t, waveform = rendered[preset]
         axes[i].plot(t, waveform)
-        axes[i].set_title(f"Waveform: {synth.signalType} with {synth.modulationType} modulation (Preset: {i})")
+        axes[i].set_title(f"Waveform: {preset.signal} with {preset.modulation} modulation (Preset: {i})")
         axes[i].set_xlabel("Time [s]")
         axes[i].set_ylabel("Amplitude")
         axes[i].grid(True)
@@ -0,0 +1,217 @@
+import math
+import time
+from functools import lru_cache
+
+import numpy as np
+
+from actuatorLayout import ActuatorLayout, HSD_POSITIONS
+
+# Position des 6 actionneurs dans le plan normalisé (ports 1 à 6)
+ACTUATORS = HSD_POSITIONS
+HORIZON_ROUND_TRIPS = 12  # Le pattern horizontal fait toujours 12 aller-retours
+BASE_PATTERN_STEPS = 200  # Nombre de pas d'un pattern à la vitesse 1
+
+PATTERNS = ("Circulaire", "DroiteGauche", "Diagonal", "Horizontal", "Vertical")
+
+
+def patternTrajectory(pattern, nPattern, numRoundTrips=1):
+    """Positions (m, 2) parcourues par un pattern et longueur du log d'intensités
+
+    La position i est enregistrée à l'étape i du log ; les étapes au-delà de m gardent
+    l'intensité 1 (fin de log non parcourue, comme avec les anciennes boucles).
+    """
+    n = nPattern
+    if pattern == "Circulaire":
+        # Angle accumulé pas à pas, comme dans la boucle d'origine
+        angles = np.cumsum(np.full(n, 2 * math.pi / n))
+        x = 0.5 + 0.3 * np.cos(angles)
+        y = 0.5 + 0.3 * np.sin(angles)
+        length = n
+    elif pattern == "DroiteGauche":
+        pointsPerTrip = n // numRoundTrips
+        x = np.tile(np.linspace(0.9, 0.1, pointsPerTrip), numRoundTrips)
+        y = np.full(len(x), 0.5)
+        length = len(x)  # Le log est redimensionné à un nombre entier d'allers
+    elif pattern == "Diagonal":
+        progress = np.arange(n) / n
+        x = 0.1 + (0.9 - 0.1) * progress
+        y = 0.1 + (0.9 - 0.1) * progress
+        length = n
+    elif pattern == "Horizontal":
+        pointsPerTrip = n // (2 * HORIZON_ROUND_TRIPS)
+        trip = np.concatenate((np.linspace(0.1, 0.9, pointsPerTrip), np.linspace(0.9, 0.1, pointsPerTrip)))
+        x = np.tile(trip, HORIZON_ROUND_TRIPS)
+        y = np.full(len(x), 0.5)
+        length = n
+    elif pattern == "Vertical":
+        half = n // 2
+        y = np.concatenate((np.linspace(0.1, 0.9, half), np.linspace(0.9, 0.1, half)))
+        x = np.full(len(y), 0.5)
+        length = n
+    else:
+        raise ValueError(f"Pattern '{pattern}' non reconnu")
+    return np.column_stack((x, y)), length
+
+
+def patternPositionAt(pattern, phase, numRoundTrips=1):
+    """Positions (m, 2) d'un pattern à des phases continues (1 = un pattern complet, périodique)
+
+    Mêmes formes que patternTrajectory, sans discrétisation : utilisable à n'importe quel instant.
+    """
+    phase = np.mod(np.asarray(phase, dtype=np.float64).reshape(-1), 1.0)
+    if pattern == "Circulaire":
+        x = 0.5 + 0.3 * np.cos(2 * math.pi * phase)
+        y = 0.5 + 0.3 * np.sin(2 * math.pi * phase)
+    elif pattern == "DroiteGauche":
+        x = 0.9 - 0.8 * np.mod(phase * numRoundTrips, 1.0)
+        y = np.full(len(x), 0.5)
+    elif pattern == "Diagonal":
+        x = y = 0.1 + 0.8 * phase
+    elif pattern == "Horizontal":
+        x = 0.1 + 0.8 * (1 - np.abs(1 - 2 * np.mod(phase * HORIZON_ROUND_TRIPS, 1.0)))
+        y = np.full(len(x), 0.5)
+    elif pattern == "Vertical":
+        y = 0.1 + 0.8 * (1 - np.abs(1 - 2 * phase))
+        x = np.full(len(y), 0.5)
+    else:
+        raise ValueError(f"Pattern '{pattern}' non reconnu")
+    return np.column_stack((x, y))
+
+
+@lru_cache(maxsize=16)
+def _positionsLayout(actuators):
+    # Autres positions que la grille 2×3 : triangulation, canaux numérotés dans l'ordre
+    return ActuatorLayout(range(1, len(actuators) + 1), actuators, range(len(actuators)))
+
+
+def intensitiesFromPositions(positions, actuators=ACTUATORS):
+    """Intensités (n, m) des actionneurs pour m positions (actionneur fantôme d'intensité 1)
+
+    Avec une ActuatorLayout : coordonnées barycentriques dans la triangulation (n quelconque).
+    Avec les 6 positions de la grille 2×3 : interpolation bilinéaire par moitié de plan,
+    actionneurs 1, 3, 5, 6 à gauche du centre, 2, 4, 5, 6 à droite, seulement 5 et 6 sur
+    l'axe central. Valeurs bornées à [0, 1]. Tout autre tuple de positions est triangulé
+    comme une ActuatorLayout.
+    """
+    if isinstance(actuators, ActuatorLayout):
+        return actuators.gains(positions)
+    if len(actuators) != 6:
+        return _positionsLayout(tuple(tuple(float(c) for c in point) for point in actuators)).gains(positions)
+    positions = np.asarray(positions, dtype=np.float64).reshape(-1, 2)
+    x, y = positions[:, 0], positions[:, 1]
+    (xc1, yc1), (xc2, _), _, (_, yc4), (xc5, _), _ = actuators
+
+    gamma = (x - xc1) / (xc2 - xc1)
+    beta = (y - yc1) / (yc4 - yc1)
+    left = gamma < 0.5
+    right = gamma > 0.5
+    alphaLeft = (x - xc1) / (xc5 - xc1)
+    alphaRight = (x - xc5) / (xc2 - xc5)
+
+    intensities = np.zeros((6, len(x)))
+    intensities[0] = np.where(left, (1 - alphaLeft) * (1 - beta), 0)
+    intensities[1] = np.where(right, alphaRight * (1 - beta), 0)
+    intensities[2] = np.where(left, (1 - alphaLeft) * beta, 0)
+    intensities[3] = np.where(right, alphaRight * beta, 0)
+    intensities[4] = np.where(left, alphaLeft * (1 - beta), np.where(right, (1 - alphaRight) * (1 - beta), 1 - beta))
+    intensities[5] = np.where(left, alphaLeft * beta, np.where(right, (1 - alphaRight) * beta, beta))
+    np.clip(intensities, 0, 1, out=intensities)
+    return intensities
+
+
+def compileTrajectory(pattern, nPattern, numRoundTrips=1, actuators=ACTUATORS):
+    """Log d'intensités (n actionneurs, longueur) et positions d'un pattern, en une passe vectorisée"""
+    positions, length = patternTrajectory(pattern, nPattern, numRoundTrips)
+    logIntensity = np.ones((len(actuators), length))
+    logIntensity[:, :len(positions)] = intensitiesFromPositions(positions, actuators)
+    return logIntensity, positions
+
+
+def patternSteps(speed):
+    """Nombre de pas d'un pattern joué à `speed` (toujours calculé depuis BASE_PATTERN_STEPS)"""
+    return int(BASE_PATTERN_STEPS * speed)
+
+
+@lru_cache(maxsize=128)
+def compile_pattern(pattern, speed=1.0, duration=2.0, round_trips=1, layout=ACTUATORS):
+    """Compile un pattern sans état : (logIntensity, positions, durée jouée)
+
+    Fonction pure, mémoïsée par ses arguments : un même pattern n'est calculé qu'une fois
+    par session. Les tableaux renvoyés sont partagés, donc en lecture seule.
+    `layout` : positions de la grille 2×3 ou ActuatorLayout (une ligne du log par actionneur).
+    """
+    if pattern is None:
+        logIntensity, positions = np.ones((len(layout), patternSteps(speed))), np.zeros((0, 2))
+    else:
+        logIntensity, positions = compileTrajectory(pattern, patternSteps(speed), round_trips, layout)
+    logIntensity.setflags(write=False)
+    positions.setflags(write=False)
+    return logIntensity, positions, duration / speed
+
+
+def patternLogLoop(pattern, nPattern, numRoundTrips=1):
+    """Version de référence pas à pas (anciennes boucles de PatternManager)"""
+    from patternManager import PatternManager
+    manager = PatternManager()
+    steps = []
+
+    if pattern == "Circulaire":
+        angle = 0
+        for i in range(nPattern):
+            angle += 2 * math.pi / nPattern
+            steps.append((i, 0.5 + 0.3 * math.cos(angle), 0.5 + 0.3 * math.sin(angle)))
+        length = nPattern
+    elif pattern == "DroiteGauche":
+        pointsPerTrip = nPattern // numRoundTrips
+        length = pointsPerTrip * numRoundTrips
+        for trip in range(numRoundTrips):
+            xVals = np.linspace(0.9, 0.1, pointsPerTrip)
+            for i in range(pointsPerTrip):
+                steps.append((trip * pointsPerTrip + i, xVals[i], 0.5))
+    elif pattern == "Diagonal":
+        for i in range(nPattern):
+            progress = i / nPattern
+            steps.append((i, 0.1 + (0.9 - 0.1) * progress, 0.1 + (0.9 - 0.1) * progress))
+        length = nPattern
+    elif pattern == "Horizontal":
+        pointsPerTrip = nPattern // (2 * HORIZON_ROUND_TRIPS)
+        for trip in range(HORIZON_ROUND_TRIPS):
+            for i in range(pointsPerTrip):
+                steps.append((trip * 2 * pointsPerTrip + i, np.linspace(0.1, 0.9, pointsPerTrip)[i], 0.5))
+            for i in range(pointsPerTrip):
+                steps.append((trip * 2 * pointsPerTrip + pointsPerTrip + i, np.linspace(0.9, 0.1, pointsPerTrip)[i], 0.5))
+        length = nPattern
+    elif pattern == "Vertical":
+        half = nPattern // 2
+        for i in range(half):
+            steps.append((i, 0.5, np.linspace(0.1, 0.9, half)[i]))
+        for i in range(half):
+            steps.append((i + half, 0.5, np.linspace(0.9, 0.1, half)[i]))
+        length = nPattern
+    else:
+        raise ValueError(f"Pattern '{pattern}' non reconnu")
+
+    logIntensity = np.ones((6, length))
+    for step, x, y in steps:
+        gamma = (x - 0.1) / (0.9 - 0.1)
+        beta = (y - 0.1) / (0.9 - 0.1)
+        intensities = manager.get_Intensities(1, x, gamma, beta)
+        for port in range(6):
+            logIntensity[port, step] = max(0, min(intensities[port], 1))
+    return logIntensity
+
+
+if __name__ == "__main__":
+    # Benchmark : anciennes boucles pas à pas vs compilation vectorisée
+    for nPattern in (200, 2000, 20000):
+        for pattern in PATTERNS:
+            start = time.perf_counter()
+            reference = patternLogLoop(pattern, nPattern, 3)
+            loopTime = time.perf_counter() - start
+
+            start = time.perf_counter()
+            logIntensity, _ = compileTrajectory(pattern, nPattern, 3)
+            vecTime = time.perf_counter() - start
+
+            print(f"n={nPattern:<6} {pattern:<13} boucle {loopTime * 1e3:8.1f} ms, vectorisé {vecTime * 1e3:6.3f} ms "
+                  f"(x{loopTime / vecTime:.0f}), écart max {np.max(np.abs(logIntensity - reference)):.1e}")
@@ -0,0 +1,180 @@
+import json
+import os
+import time
+from functools import lru_cache
+
+import numpy as np
+
+from renderCache import DiskRenderCache, trajectoryFingerprint
+from trajectory import ACTUATORS, intensitiesFromPositions
+
+# Fichier de trajectoire (JSON) :
+# {
+#   "interpolation": "catmull-rom",            segment par défaut (sinon "linear")
+#   "keyframes": [
+#     {"t": 0.0, "x": 0.1, "y": 0.5},
+#     {"t": 0.4, "x": 0.5, "y": 0.8, "segment": "bezier", "controls": [[0.6, 0.9], [0.8, 0.7]]},
+#     {"t": 1.0, "x": 0.9, "y": 0.5}
+#   ]
+# }
+# Les temps sont en secondes (croissants) et étirés sur toute la durée du log ; x, y sont
+# dans le plan normalisé [0, 1]². "segment" décrit le segment qui part de l'image clé.
+TRAJECTORY_EXTENSION = ".json"
+SEGMENT_TYPES = ("linear", "catmull-rom", "bezier")
+CACHE_DIRNAME = "__trajcache__"  # Répertoire de cache, à côté du fichier
+
+
+def isTrajectoryFile(pattern):
+    return isinstance(pattern, str) and pattern.endswith(TRAJECTORY_EXTENSION) and os.path.isfile(pattern)
+
+
+class Trajectory:
+    """Trajectoire validée : images clés et points de contrôle de Bézier de chaque segment
+
+    Chaque segment, quel que soit son type, est ramené à une cubique de Bézier
+    (4 points de contrôle) : l'évaluation est la même pour tous.
+    """
+
+    def __init__(self, keyframes, interpolation="linear", name=""):
+        self.name = name
+        if interpolation not in SEGMENT_TYPES:
+            raise ValueError(f"Interpolation '{interpolation}' non reconnue ({', '.join(SEGMENT_TYPES)})")
+        if not isinstance(keyframes, list) or len(keyframes) < 2:
+            raise ValueError("Une trajectoire demande au moins 2 images clés")
+
+        times, points, segments = [], [], []
+        for index, keyframe in enumerate(keyframes):
+            try:
+                t, x, y = float(keyframe["t"]), float(keyframe["x"]), float(keyframe["y"])
+            except (KeyError, TypeError, ValueError):
+                raise ValueError(f"Image clé {index} : champs numériques 't', 'x' et 'y' attendus")
+            if not (0.0 <= x <= 1.0 and 0.0 <= y <= 1.0):
+                raise ValueError(f"Image clé {index} : position ({x}, {y}) hors du plan [0, 1]²")
+            if times and t <= times[-1]:
+                raise ValueError(f"Image clé {index} : temps {t} non croissant")
+            segment = keyframe.get("segment", interpolation)
+            if segment not in SEGMENT_TYPES:
+                raise ValueError(f"Image clé {index} : segment '{segment}' non reconnu")
+            times.append(t)
+            points.append((x, y))
+            segments.append((segment, keyframe.get("controls")))
+
+        self.times = np.array(times)
+        self.points = np.array(points)
+        self.controls = self._bezierControls(segments[:-1])
+
+    def _bezierControls(self, segments):
+        """Points de contrôle (segments, 4, 2) de la cubique de Bézier de chaque segment"""
+        p, t = self.points, self.times
+        # Tangentes de Catmull-Rom tenant compte des temps (différences décentrées aux extrémités)
+        previous = np.maximum(np.arange(len(p)) - 1, 0)
+        following = np.minimum(np.arange(len(p)) + 1, len(p) - 1)
+        tangents = (p[following] - p[previous]) / (t[following] - t[previous])[:, None]
+
+        controls = np.empty((len(segments), 4, 2))
+        for i, (segment, handles) in enumerate(segments):
+            start, stop, span = p[i], p[i + 1], t[i + 1] - t[i]
+            if segment == "linear":
+                inner = (start + (stop - start) / 3, start + 2 * (stop - start) / 3)
+            elif segment == "catmull-rom":
+                inner = (start + tangents[i] * span / 3, stop - tangents[i + 1] * span / 3)
+            else:
+                try:
+                    inner = np.array(handles, dtype=np.float64).reshape(2, 2)
+                except (TypeError, ValueError):
+                    raise ValueError(f"Image clé {i} : segment bezier sans 'controls' [[x1, y1], [x2, y2]]")
+            controls[i] = (start, inner[0], inner[1], stop)
+        return controls
+
+    @property
+    def duration(self):
+        return float(self.times[-1] - self.times[0])
+
+    def evaluate(self, times):
+        """Positions (m, 2) aux instants `times` (bornés aux images clés extrêmes)"""
+        times = np.clip(np.asarray(times, dtype=np.float64), self.times[0], self.times[-1])
+        segment = np.clip(np.searchsorted(self.times, times, side='right') - 1, 0, len(self.controls) - 1)
+        u = (times - self.times[segment]) / (self.times[segment + 1] - self.times[segment])
+        v = 1.0 - u
+        bernstein = np.column_stack((v * v * v, 3 * v * v * u, 3 * v * u * u, u * u * u))
+        return np.einsum('mk,mkj->mj', bernstein, self.controls[segment])
+
+    def sample(self, numSteps):
+        """Positions des numSteps pas du log : de la première à la dernière image clé"""
+        return self.evaluate(np.linspace(self.times[0], self.times[-1], numSteps))
+
+
+def loadTrajectory(path):
+    """Lit et valide un fichier de trajectoire ; ValueError si le fichier est invalide"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except json.JSONDecodeError as e:
+        raise ValueError(f"Trajectoire {path} : JSON invalide ({e})")
+    if not isinstance(data, dict):
+        raise ValueError(f"Trajectoire {path} : objet JSON attendu")
+    return Trajectory(data.get("keyframes"), data.get("interpolation", "linear"),
+                      data.get("name", os.path.splitext(os.path.basename(path))[0]))
+
+
+def _diskCache(path):
+    try:
+        return DiskRenderCache(os.path.join(os.path.dirname(os.path.abspath(path)), CACHE_DIRNAME))
+    except OSError:
+        return None  # Répertoire non inscriptible : compilation sans cache disque
+
+
+@lru_cache(maxsize=32)
+def _compileFile(path, fingerprint, numSteps, layout):
+    # `fingerprint` (chemin, taille, date) invalide l'entrée mémoire quand le fichier change
+    cache = _diskCache(path)
+    stored = cache.load(fingerprint) if cache is not None else None
+    if stored is not None:
+        arrays, _ = stored
+        return arrays["logIntensity"], arrays["positions"]
+
+    positions = loadTrajectory(path).sample(numSteps)
+    logIntensity = intensitiesFromPositions(positions, layout)
+    if cache is not None:
+        cache.save(fingerprint, {"logIntensity": logIntensity, "positions": positions})
+    logIntensity.setflags(write=False)
+    positions.setflags(write=False)
+    return logIntensity, positions
+
+
+def compileTrajectoryFile(path, numSteps, layout=ACTUATORS):
+    """Log d'intensités (n actionneurs, numSteps) et positions d'un fichier de trajectoire
+
+    Compilé une fois, puis relu depuis la mémoire ou le cache disque voisin du fichier
+    tant que le fichier, le nombre de pas et la disposition ne changent pas. Lecture seule.
+    """
+    return _compileFile(path, trajectoryFingerprint(path, numSteps, layout), numSteps, layout)
+
+
+if __name__ == "__main__":
+    # Compilation d'un fichier d'exemple : premier appel, cache disque, mémoire
+    import sys
+    here = os.path.dirname(os.path.abspath(__file__))
+    path = sys.argv[1] if len(sys.argv) > 1 else os.path.join(here, "trajectories", "Vague.json")
+    trajectory = loadTrajectory(path)
+    print(f"{trajectory.name} : {len(trajectory.points)} images clés, {trajectory.duration:.2f} s")
+
+    for numSteps in (200, 2000, 20000):
+        start = time.perf_counter()
+        positions = trajectory.sample(numSteps)
+        intensitiesFromPositions(positions)
+        compileTime = time.perf_counter() - start
+
+        _compileFile.cache_clear()
+        start = time.perf_counter()
+        logIntensity, _ = compileTrajectoryFile(path, numSteps)
+        firstTime = time.perf_counter() - start
+        _compileFile.cache_clear()
+        start = time.perf_counter()
+        compileTrajectoryFile(path, numSteps)
+        diskTime = time.perf_counter() - start
+        start = time.perf_counter()
+        compileTrajectoryFile(path, numSteps)
+        memoryTime = time.perf_counter() - start
+        print(f"{numSteps:>6} pas : compilation {compileTime * 1e3:.3f} ms, premier appel {firstTime * 1e3:.3f} ms, "
+              f"cache disque {diskTime * 1e3:.3f} ms, mémoire {memoryTime * 1e6:.1f} µs")
@@ -0,0 +1,134 @@
+import os
+from functools import lru_cache
+
+import numpy as np
+from scipy.io import wavfile
+from filterDesign import ChunkFilter
+from resampler import resampleBlocks, resampleSignal
+
+
+def openWav(filepath):
+    """Ouvre un WAV en mémoire mappée (lecture complète si le format ne le permet pas)"""
+    try:
+        return wavfile.read(filepath, mmap=True)
+    except ValueError:
+        return wavfile.read(filepath)
+
+
+def normalizeBlock(raw, dtype=np.float32):
+    """Convertit un bloc brut en mono flottant dans [-1, 1]"""
+    if raw.dtype == np.int16:
+        block = raw.astype(dtype) / 32768.0
+    elif raw.dtype == np.int32:
+        block = raw.astype(dtype) / 2147483648.0
+    elif raw.dtype == np.uint8:
+        block = (raw.astype(dtype) - 128) / 128.0
+    else:
+        block = raw.astype(dtype, copy=False)
+
+    # Si stéréo, faire une moyenne (mono)
+    if block.ndim == 2:
+        block = block.mean(axis=1, dtype=dtype)
+    return block
+
+
+def wavInfo(filepath):
+    """Renvoie (fs, nombre d'échantillons, durée) sans décoder le fichier"""
+    fs, data = openWav(filepath)
+    return fs, data.shape[0], data.shape[0] / fs
+
+
+def wavBlocks(filepath, blockSize=8192, amp=1.0, cutoff=None, order=5, loop=False, dtype=np.float32):
+    """Générateur de blocs mono normalisés, filtrés en continu d'un bloc à l'autre
+
+    Avec loop=True, le fichier est relu indéfiniment et chaque bloc fait exactement
+    blockSize échantillons, ce qui convient au callback audio.
+    """
+    fs, data = openWav(filepath)
+    total = data.shape[0]
+    if total == 0:
+        return
+    lowpass = ChunkFilter(cutoff, fs, order) if cutoff is not None else None
+
+    pos = 0
+    while True:
+        end = min(pos + blockSize, total)
+        block = normalizeBlock(data[pos:end], dtype)
+        pos = end
+
+        if loop:
+            # Compléter le bloc en repartant du début du fichier
+            parts = [block]
+            filled = len(block)
+            while filled < blockSize:
+                if pos >= total:
+                    pos = 0
+                end = min(pos + blockSize - filled, total)
+                parts.append(normalizeBlock(data[pos:end], dtype))
+                filled += end - pos
+                pos = end
+            if len(parts) > 1:
+                block = np.concatenate(parts)
+        elif len(block) == 0:
+            return
+
+        if amp != 1.0:
+            block = block * amp
+        if lowpass is not None:
+            block = lowpass.process(block)
+        yield block
+
+        if not loop and pos >= total:
+            return
+
+
+def prepareWav(filepath, numSamples=None, amp=1.0, cutoff=None, order=5, blockSize=65536, dtype=np.float64, targetRate=None):
+    """Décode, normalise et filtre un WAV bloc par bloc dans un unique buffer de sortie
+
+    Si targetRate diffère de la fréquence du fichier, les blocs sont convertis à la volée
+    avant le filtrage. Le signal est tronqué ou complété par des zéros à numSamples échantillons.
+    """
+    fs, total, _ = wavInfo(filepath)
+    outRate = targetRate if targetRate is not None else fs
+    if numSamples is None:
+        numSamples = -(-total * int(outRate) // int(fs))
+
+    if outRate == fs:
+        blocks = wavBlocks(filepath, blockSize, amp, cutoff, order)
+    else:
+        blocks = resampleBlocks(wavBlocks(filepath, blockSize, amp), fs, outRate)
+        if cutoff is not None:
+            lowpass = ChunkFilter(cutoff, outRate, order)
+            blocks = (lowpass.process(block) for block in blocks)
+
+    output = np.zeros(numSamples, dtype=dtype)
+    pos = 0
+    for block in blocks:
+        if pos >= numSamples:
+            break
+        n = min(len(block), numSamples - pos)
+        output[pos:pos + n] = block[:n]
+        pos += n
+    return output, outRate
+
+
+@lru_cache(maxsize=8)
+def _decodedWav(path, size, mtime):
+    fs, data = openWav(path)
+    mono = normalizeBlock(data)
+    mono.setflags(write=False)
+    return fs, mono
+
+
+@lru_cache(maxsize=16)
+def _resampledWav(path, size, mtime, fsOut):
+    fs, mono = _decodedWav(path, size, mtime)
+    converted = resampleSignal(mono, fs, fsOut).astype(np.float32, copy=False)
+    converted.setflags(write=False)
+    return converted
+
+
+def resampledWav(filepath, fsOut):
+    """Source WAV mono normalisée à fsOut, décodée une fois puis mise en cache par (fichier, fréquence)"""
+    stat = os.stat(filepath)
+    return _resampledWav(os.path.abspath(filepath), stat.st_size, stat.st_mtime_ns, int(fsOut))